@@ -0,0 +1,236 @@
+# __main__.py
+# Línea de órdenes sin interfaz gráfica (no importa Qt ni Matplotlib).
+# Lee conjuntos de parámetros (CSV con cabecera o JSON-lines, de ficheros o de
+# la entrada estándar) y escribe los resultados por trozos en CSV, JSON-lines,
+# Parquet o Arrow, así que la memoria no crece con el número de ejecuciones.
+# Ejecutar (desde la carpeta que contiene el proyecto, o con "python ." dentro):
+#     python -m simulator params.csv -o resultados.parquet
+#     cat params.jsonl | python -m simulator --format jsonl
+#     python -m simulator params.csv --trajectories --integrator rk4 -o trayectorias.csv
+# Cada fila de entrada puede dar cualquier subconjunto de v0, angle_deg, mass,
+# area, cd, wind, g, rho, dt, max_time, y0; el resto toma el valor por defecto.
+
+import argparse
+import csv
+import inspect
+import io
+import itertools
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from core import ProjectileSimulator, Trajectory
+from integrators import INTEGRATORS
+from sweep import MAX_STEPS, PARAMS, SUMMARY, check_row, run_sweep
+
+INPUTS = PARAMS + ("max_time", "y0")
+DEFAULTS = {name: p.default for name, p in inspect.signature(ProjectileSimulator.__init__).parameters.items()
+            if name in INPUTS}
+FORMATS = ("csv", "jsonl", "parquet", "arrow")
+_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl",
+               ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+
+# -----------------------------
+# Entrada
+# -----------------------------
+def _input_format(path, text):
+    ext = os.path.splitext(path)[1].lower() if path != "-" else ""
+    if ext in (".csv", ".jsonl", ".ndjson", ".json"):
+        return "csv" if ext == ".csv" else "jsonl"
+    return "jsonl" if text.lstrip().startswith("{") else "csv"
+
+
+def read_params(stream, fmt, max_steps=MAX_STEPS):
+    """
+    Genera un dict por conjunto de parámetros (completado con los valores por
+    defecto). ValueError con el número de fila si alguna no pasa
+    sweep.check_row (valores no finitos o no positivos, demasiados pasos).
+    """
+    if fmt == "csv":
+        records = csv.DictReader(line for line in stream if line.strip())
+    else:
+        records = (json.loads(line) for line in stream if line.strip())
+    for n, record in enumerate(records, 1):
+        unknown = set(record) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"fila {n}: parámetros desconocidos: {', '.join(sorted(unknown))}")
+        row = dict(DEFAULTS)
+        try:
+            for name, value in record.items():
+                if value not in (None, ""):
+                    row[name] = float(value)
+            check_row(row, max_steps)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"fila {n}: {e}") from None
+        yield row
+
+
+def iter_inputs(paths, max_steps=MAX_STEPS):
+    """Parámetros de todos los ficheros en orden ("-" es la entrada estándar)."""
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        try:
+            # se mira la primera línea para distinguir CSV de JSON-lines
+            first = stream.readline()
+            fmt = _input_format(path, first)
+            yield from read_params(itertools.chain([first], stream), fmt, max_steps)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+# -----------------------------
+# Salida por trozos
+# -----------------------------
+class _CsvWriter:
+    def __init__(self, out):
+        self.out = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        self.writer = csv.writer(self.out)
+        self.header = False
+
+    def write(self, columns):
+        if not self.header:
+            self.writer.writerow(columns)
+            self.header = True
+        self.writer.writerows(zip(*(c.tolist() for c in columns.values())))
+
+    def close(self):
+        self.out.flush()
+        self.out.detach()
+
+
+class _JsonLinesWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, columns):
+        names = list(columns)
+        lines = (json.dumps(dict(zip(names, values))) for values in
+                 zip(*(c.tolist() for c in columns.values())))
+        self.out.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def close(self):
+        self.out.flush()
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow
+    except ImportError:
+        raise SystemExit(f"el formato {fmt} requiere el paquete pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+class _ArrowWriter:
+    """Parquet (un grupo de filas por trozo) o flujo IPC de Arrow; requiere pyarrow."""
+    def __init__(self, out, fmt):
+        self.pa = _require_pyarrow(fmt)
+        self.out = out
+        self.fmt = fmt
+        self.writer = None
+
+    def write(self, columns):
+        table = self.pa.table(columns)
+        if self.writer is None:
+            if self.fmt == "parquet":
+                import pyarrow.parquet
+                self.writer = pyarrow.parquet.ParquetWriter(self.out, table.schema)
+            else:
+                self.writer = self.pa.ipc.new_stream(self.out, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.out.flush()
+
+
+def make_writer(out, fmt):
+    if fmt == "csv":
+        return _CsvWriter(out)
+    if fmt == "jsonl":
+        return _JsonLinesWriter(out)
+    return _ArrowWriter(out, fmt)
+
+
+# -----------------------------
+# Ejecución
+# -----------------------------
+def summary_chunks(params, chunk_size, workers, backend):
+    """Resúmenes (una fila por ejecución) agrupados en columnas de chunk_size filas."""
+    rows = run_sweep(params, chunk_size=chunk_size, max_workers=workers, backend=backend)
+    names = ("index",) + INPUTS + SUMMARY
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield {name: np.array([r[name] for r in chunk]) for name in names}
+
+
+def trajectory_chunks(params, integrator, backend):
+    """Todas las muestras de cada ejecución (una trayectoria por trozo, columna "run")."""
+    for i, row in enumerate(params):
+        traj = ProjectileSimulator(**row, integrator=integrator, backend=backend).run()
+        columns = {"run": np.full(len(traj), i)}
+        columns.update(zip(Trajectory.COLUMNS, traj.data))
+        yield columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator",
+        description="Simulaciones sin interfaz: lee parámetros (CSV o JSON-lines) y escribe resultados.")
+    parser.add_argument("inputs", nargs="*", default=["-"],
+                        help="ficheros de parámetros (por defecto la entrada estándar, \"-\")")
+    parser.add_argument("-o", "--output", default="-", help="fichero de salida (por defecto la salida estándar)")
+    parser.add_argument("-f", "--format", choices=FORMATS,
+                        help="formato de salida (por defecto según la extensión, o csv)")
+    parser.add_argument("--trajectories", action="store_true",
+                        help="escribe todas las muestras de cada trayectoria en lugar del resumen")
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="semi_implicit",
+                        help="integrador (con --trajectories; el resumen usa siempre semi_implicit)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="ejecuciones por trozo del resumen")
+    parser.add_argument("--workers", type=int, default=1, help="procesos para el resumen (0 = todos los núcleos)")
+    parser.add_argument("--backend", choices=("auto", "python", "numba"), default="auto")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+                        help="límite de max_time / dt por fila (las que lo superan son un error)")
+    args = parser.parse_args(argv)
+
+    if args.integrator != "semi_implicit" and not args.trajectories:
+        parser.error("--integrator solo se admite con --trajectories")
+    fmt = args.format or _EXTENSIONS.get(os.path.splitext(args.output)[1].lower(), "csv")
+    params = iter_inputs(args.inputs, args.max_steps)
+    if args.trajectories:
+        chunks = trajectory_chunks(params, args.integrator, args.backend)
+    else:
+        chunks = summary_chunks(params, args.chunk_size, args.workers or None, args.backend)
+
+    if fmt in ("parquet", "arrow"):
+        _require_pyarrow(fmt)       # antes de crear el fichero de salida
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    writer = make_writer(out, fmt)
+    try:
+        for columns in chunks:
+            writer.write(columns)
+        writer.close()
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+    except BrokenPipeError:
+        # la salida se cerró antes de tiempo (p. ej. "| head"): se termina sin traza
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
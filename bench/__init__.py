@@ -0,0 +1,3 @@
+# bench/__init__.py
+# Benchmarks del simulador (se ejecutan desde la raíz del repositorio)
+# Ejemplo: python -m bench.integrators
@@ -0,0 +1,92 @@
+# bench/backends.py
+# Paridad y velocidad de los backends "python" y "numba" (kernels.py):
+# comprueba que las trayectorias son idénticas bit a bit y mide el coste por paso.
+# Ejecutar: python -m bench.backends
+
+import sys
+import time
+
+import numpy as np
+
+import kernels
+from core import ProjectileSimulator, BatchProjectileSimulator
+
+# lanzamientos de paridad: arrastre fuerte y nulo, viento, altura inicial,
+# ángulos negativos y corte por max_time
+CASES = [
+    dict(),
+    dict(v0=80.0, angle_deg=70.0, cd=0.1, wind=-5.0),
+    dict(v0=15.0, angle_deg=10.0, mass=0.05, cd=1.2, wind=8.0),
+    dict(cd=0.0, area=0.0),
+    dict(y0=10.0, angle_deg=-10.0, mass=0.2),
+    dict(v0=300.0, angle_deg=60.0, max_time=2.0),
+    dict(v0=5.0, angle_deg=89.0, dt=0.001),
+]
+
+
+def _random_batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(v0=rng.uniform(5, 80, n), angle_deg=rng.uniform(-20, 89, n), mass=rng.uniform(0.1, 5, n),
+                cd=rng.uniform(0, 1, n), wind=rng.uniform(-10, 10, n), y0=rng.choice([0.0, 0.0, 5.0], n))
+
+
+def check_parity():
+    """Lista de discrepancias (vacía si ambos backends coinciden exactamente)."""
+    problems = []
+    for kwargs in CASES:
+        ref = ProjectileSimulator(**kwargs, backend="python").run()
+        fast = ProjectileSimulator(**kwargs, backend="numba").run()
+        if ref.data.shape != fast.data.shape or not np.array_equal(ref.data, fast.data):
+            problems.append(f"run() {kwargs}")
+    params = _random_batch(2000)
+    results = []
+    for backend in ("python", "numba"):
+        batch = BatchProjectileSimulator(**params, backend=backend)
+        batch.run()
+        results.append(np.stack([batch.x, batch.y, batch.vx, batch.vy, batch.t]))
+    if not np.array_equal(*results):
+        problems.append("BatchProjectileSimulator.run()")
+    return problems
+
+
+def _best(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_speed(dt=1e-4, n_batch=10000):
+    """Segundos por muestra de run() y por lote de n_batch proyectiles, por backend."""
+    out = {}
+    for backend in ("python", "numba"):
+        ProjectileSimulator(backend=backend).run()      # compilación/carga del núcleo
+        samples = len(ProjectileSimulator(dt=dt, backend=backend).run())
+        per_sample = _best(lambda: ProjectileSimulator(dt=dt, backend=backend).run()) / samples
+        params = _random_batch(n_batch, seed=1)
+        per_batch = _best(lambda: BatchProjectileSimulator(**params, backend=backend).run())
+        out[backend] = {"seconds_per_sample": per_sample, "batch_seconds": per_batch}
+    return out
+
+
+def main():
+    if not kernels.HAVE_NUMBA:
+        print("numba no está instalado: solo existe el backend python")
+        return 0
+    problems = check_parity()
+    print("paridad:", "idéntica" if not problems else "DIFERENCIAS en " + "; ".join(problems))
+    speed = measure_speed()
+    py, nb = speed["python"], speed["numba"]
+    print(f"run():  python {py['seconds_per_sample'] * 1e9:8.0f} ns/paso   "
+          f"numba {nb['seconds_per_sample'] * 1e9:8.0f} ns/paso   "
+          f"x{py['seconds_per_sample'] / nb['seconds_per_sample']:.1f}")
+    print(f"lote:   python {py['batch_seconds'] * 1e3:8.1f} ms        "
+          f"numba {nb['batch_seconds'] * 1e3:8.1f} ms        "
+          f"x{py['batch_seconds'] / nb['batch_seconds']:.1f}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# bench/integrators.py
+# Compara los integradores de ProjectileSimulator: pasos, evaluaciones de
+# fuerza, tiempo de cálculo y error frente a una referencia, tanto en la
+# posición a un tiempo fijo como en el punto de impacto.
+# Ejecutar: python -m bench.integrators
+
+import time
+
+from core import ProjectileSimulator
+
+# lanzamiento de referencia y horizonte (antes del impacto, para medir solo
+# el error del integrador). dt potencias de 2 para que t llegue exacto a T.
+LAUNCH = dict(v0=50.0, angle_deg=45.0, mass=1.0, area=0.01, cd=0.47, wind=-3.0)
+HORIZON = 2.0
+FIXED_DTS = [2.0 ** -k for k in range(3, 13)]
+TOLERANCES = [10.0 ** -k for k in range(3, 11)]
+
+
+class _CountingSimulator(ProjectileSimulator):
+    """ProjectileSimulator que cuenta las evaluaciones de la fuerza."""
+    evaluations = 0
+
+    def _accel(self, t, x, y, vx, vy):
+        self.evaluations += 1
+        return super()._accel(t, x, y, vx, vy)
+
+
+def _measure(max_time=HORIZON, **kwargs):
+    sim = _CountingSimulator(**LAUNCH, max_time=max_time, **kwargs)
+    start = time.perf_counter()
+    steps = 0
+    while not sim.finished:
+        sim.step()
+        steps += 1
+    elapsed = time.perf_counter() - start
+    return sim, steps, elapsed
+
+
+def run_benchmark():
+    """Devuelve una lista de filas (dict) con pasos, evaluaciones, tiempo y error."""
+    ref, _, _ = _measure(integrator="rk45", rtol=1e-13, atol=1e-13)
+    rows = []
+
+    def add(method, setting, sim, steps, elapsed):
+        err = ((sim.x - ref.x) ** 2 + (sim.y - ref.y) ** 2) ** 0.5
+        rows.append({"method": method, "setting": setting, "steps": steps,
+                     "evaluations": sim.evaluations, "seconds": elapsed, "error_m": err})
+
+    for method in ("euler", "semi_implicit", "rk4"):
+        for dt in FIXED_DTS:
+            add(method, f"dt={dt:.3g}", *_measure(integrator=method, dt=dt))
+    for tol in TOLERANCES:
+        add("rk45", f"rtol={tol:.0e}", *_measure(integrator="rk45", rtol=tol, atol=tol * 1e-3))
+    return rows
+
+
+def run_impact_benchmark():
+    """Como run_benchmark() pero hasta el suelo: error del alcance (x de impacto)."""
+    flight = dict(max_time=300.0)
+    ref, _, _ = _measure(integrator="rk45", rtol=1e-13, atol=1e-13, **flight)
+    rows = []
+    for method, settings in (("semi_implicit", [dict(dt=dt) for dt in (0.1, 0.01, 0.001)]),
+                             ("rk4", [dict(dt=dt) for dt in (0.5, 0.1, 0.01)]),
+                             ("rk45", [dict(rtol=tol, atol=tol * 1e-3) for tol in (1e-4, 1e-6, 1e-8)])):
+        for kwargs in settings:
+            sim, steps, elapsed = _measure(integrator=method, **flight, **kwargs)
+            rows.append({"method": method, "setting": ", ".join(f"{k}={v:.0e}" for k, v in kwargs.items()
+                                                                if k != "atol"),
+                         "steps": steps, "evaluations": sim.evaluations, "seconds": elapsed,
+                         "error_m": abs(sim.impact["pos"][0] - ref.impact["pos"][0])})
+    return rows
+
+
+def _print_table(title, rows):
+    print(title)
+    print(f"{'método':<14}{'ajuste':<14}{'pasos':>8}{'evals':>9}{'tiempo (ms)':>13}{'error (m)':>12}")
+    for row in rows:
+        print(f"{row['method']:<14}{row['setting']:<14}{row['steps']:>8}{row['evaluations']:>9}"
+              f"{row['seconds'] * 1e3:>13.3f}{row['error_m']:>12.2e}")
+
+
+def main():
+    _print_table(f"Posición en t = {HORIZON} s", run_benchmark())
+    print()
+    _print_table("Alcance (punto de impacto)", run_impact_benchmark())
+
+
+if __name__ == "__main__":
+    main()
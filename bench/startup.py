@@ -0,0 +1,78 @@
+# bench/startup.py
+# Tiempo de arranque de la interfaz: desde que se lanza el proceso hasta que
+# la ventana se muestra (gui.py --startup-time), y perfil de importaciones al
+# estilo de "python -X importtime" con los módulos que más tardan antes de
+# que aparezca la ventana.
+# Ejecutar: python -m bench.startup [--repeat 5] [--top 15]
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+GUI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gui.py")
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def time_to_window(repeat=5):
+    """Mejor tiempo (s) desde el lanzamiento de gui.py hasta la ventana visible."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, GUI, "--startup-time"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, env=_env(), text=True)
+        for line in proc.stdout:
+            if line.startswith("startup:"):
+                best = min(best, time.perf_counter() - start)
+                break
+        proc.wait()
+    return best
+
+
+def import_profile():
+    """
+    [(módulo, propio_us, acumulado_us, nivel)] de las importaciones hechas hasta
+    que se muestra la ventana, en el orden que da -X importtime.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", GUI, "--startup-time"],
+                          capture_output=True, env=_env(), text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative, name = line.split("|")
+        own = int(head.split(":")[1])
+        # el nombre va tras un espacio y dos más por cada nivel de anidamiento
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), own, int(cumulative), level))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de gui.py")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="importaciones de primer nivel a listar")
+    args = parser.parse_args(argv)
+
+    rows = import_profile()
+    top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])
+    total = sum(r[2] for r in top_level)
+    print(f"importaciones hasta la ventana: {total / 1e3:.0f} ms en {len(rows)} módulos")
+    print(f"{'módulo':40s} {'acumulado':>10s} {'propio':>10s}")
+    for name, own, cumulative, _ in top_level[:args.top]:
+        print(f"{name:40s} {cumulative / 1e3:8.1f} ms {own / 1e3:8.1f} ms")
+    heavy = [m for m in ("numpy", "matplotlib", "numba", "core") if any(r[0] == m for r in rows)]
+    if heavy:
+        print("aviso: se importan antes de la ventana:", ", ".join(heavy))
+    print(f"\nventana visible: {time_to_window(args.repeat) * 1e3:.0f} ms (mejor de {args.repeat})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
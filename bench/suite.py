@@ -0,0 +1,208 @@
+# bench/suite.py
+# Banco de pruebas de rendimiento del motor y del dibujado de la interfaz:
+#   - pasos por segundo de ProjectileSimulator.step() y coste de get_state() para varios dt
+#   - muestras por segundo de run()
+#   - proyectiles por segundo de BatchProjectileSimulator frente a N
+#   - memoria por muestra de la trayectoria
+#   - tiempo por fotograma del dibujado con blitting (Qt sin pantalla, "offscreen")
+# Guarda los resultados en JSON y los compara con una referencia guardada.
+# Ejecutar:
+#     python -m bench.suite --save-baseline          # primera vez: guarda la referencia
+#     python -m bench.suite                          # compara con ella (sale con 1 si empeora)
+#     python -m bench.suite --quick --output res.json
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import kernels
+from core import ProjectileSimulator, BatchProjectileSimulator
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.25        # empeoramiento relativo que se considera regresión (los tiempos son ruidosos)
+
+
+def _best(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_step(results, dts, steps):
+    """Pasos por segundo de step() y microsegundos por get_state()."""
+    for dt in dts:
+        def stepping():
+            sim = ProjectileSimulator(v0=300.0, angle_deg=80.0, dt=dt)
+            for _ in range(steps):
+                sim.step()
+        rate = steps / _best(stepping)
+        results[f"step.dt={dt:g}"] = _metric(rate, "pasos/s", "higher")
+
+    sim = ProjectileSimulator()
+    sim.step()
+    calls = steps // 10
+    elapsed = _best(lambda: [sim.get_state() for _ in range(calls)])
+    results["get_state"] = _metric(elapsed / calls * 1e6, "us", "lower")
+
+
+def bench_run(results, dts):
+    """Muestras por segundo de run() con cada backend disponible."""
+    backends = ("python", "numba") if kernels.HAVE_NUMBA else ("python",)
+    for backend in backends:
+        ProjectileSimulator(backend=backend).run()      # compilación/carga del núcleo
+        for dt in dts:
+            samples = len(ProjectileSimulator(dt=dt, backend=backend).run())
+            elapsed = _best(lambda: ProjectileSimulator(dt=dt, backend=backend).run(), repeat=3)
+            results[f"run.{backend}.dt={dt:g}"] = _metric(samples / elapsed, "muestras/s", "higher")
+
+
+def bench_batch(results, sizes):
+    """Proyectiles por segundo de BatchProjectileSimulator.run() frente a N."""
+    backends = ("python", "numba") if kernels.HAVE_NUMBA else ("python",)
+    rng = np.random.default_rng(0)
+    for backend in backends:
+        BatchProjectileSimulator(v0=[10.0, 20.0], backend=backend).run()
+        for n in sizes:
+            params = dict(v0=rng.uniform(5, 80, n), angle_deg=rng.uniform(5, 85, n), cd=rng.uniform(0, 1, n))
+            elapsed = _best(lambda: BatchProjectileSimulator(**params, backend=backend).run(), repeat=3)
+            results[f"batch.{backend}.n={n}"] = _metric(n / elapsed, "proyectiles/s", "higher")
+
+
+def bench_memory(results, dt):
+    """Bytes por muestra: los de la trayectoria devuelta y el pico durante run()."""
+    sim = ProjectileSimulator(dt=dt, backend="python")
+    tracemalloc.start()
+    traj = sim.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results["memory.trajectory"] = _metric(traj.data.nbytes / len(traj), "B/muestra", "lower")
+    results["memory.run_peak"] = _metric(peak / len(traj), "B/muestra", "lower")
+
+
+def bench_render(results, frames):
+    """
+    Milisegundos por fotograma del camino de reproducción de la interfaz
+    (SimuladorWindow._draw_frame, blitting) y de un redibujado completo.
+    Se omite si PySide6 o matplotlib no están instalados.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+        import gui
+    except ImportError as e:
+        print(f"render: omitido ({e})")
+        return
+    app = QApplication.instance() or QApplication([])
+    win = gui.SimuladorWindow()
+    win.show()
+    win.in_dt.setText("0.001")
+    win._start_simulation(show_message=False)
+    app.processEvents()
+    win.canvas.draw()
+    last = len(win.traj) - 1
+    indices = np.linspace(0, last, frames).astype(int)
+    # primera pasada: los ejes alcanzan su tamaño final; la segunda mide solo el blitting
+    for i in indices:
+        win._draw_frame(int(i))
+
+    def playback():
+        for i in indices:
+            win._draw_frame(int(i))
+    results["render.frame"] = _metric(_best(playback, repeat=3) / frames * 1e3, "ms", "lower")
+    results["render.full_draw"] = _metric(_best(win.canvas.draw, repeat=3) * 1e3, "ms", "lower")
+    win.close()
+
+
+def run_all(quick=False, render=True):
+    """Ejecuta todos los benchmarks y devuelve {"meta": ..., "results": {nombre: métrica}}."""
+    results = {}
+    dts = (0.01, 0.001) if quick else (0.01, 0.001, 0.0001)
+    bench_step(results, dts, steps=2000 if quick else 20000)
+    bench_run(results, dts)
+    bench_batch(results, (100, 1000) if quick else (100, 1000, 10000))
+    bench_memory(results, dt=0.001)
+    if render:
+        bench_render(results, frames=60 if quick else 300)
+    meta = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": kernels.HAVE_NUMBA,
+        "machine": platform.platform(),
+        "quick": quick,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    """
+    Compara dos resultados métrica a métrica. Devuelve una lista de
+    (nombre, valor actual, referencia, cambio relativo, regresión) para las
+    métricas presentes en ambos; el cambio es positivo cuando mejora.
+    """
+    rows = []
+    for name, metric in current["results"].items():
+        ref = baseline["results"].get(name)
+        if ref is None or not ref["value"]:
+            continue
+        ratio = metric["value"] / ref["value"]
+        change = ratio - 1.0 if metric["better"] == "higher" else 1.0 / ratio - 1.0
+        rows.append((name, metric["value"], ref["value"], change, change < -threshold))
+    return rows
+
+
+def _print_results(data):
+    for name, m in data["results"].items():
+        print(f"{name:28s} {m['value']:14.4g} {m['unit']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador")
+    parser.add_argument("--quick", action="store_true", help="menos repeticiones y tamaños")
+    parser.add_argument("--no-render", action="store_true", help="omite el benchmark de dibujado")
+    parser.add_argument("--output", help="guarda los resultados en este JSON")
+    parser.add_argument("--baseline", default=BASELINE, help="JSON de referencia")
+    parser.add_argument("--save-baseline", action="store_true", help="guarda los resultados como referencia")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="empeoramiento relativo que cuenta como regresión (por defecto 0.25)")
+    args = parser.parse_args(argv)
+
+    data = run_all(quick=args.quick, render=not args.no_render)
+    _print_results(data)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        print(f"referencia guardada en {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"sin referencia ({args.baseline}); guárdala con --save-baseline")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(data, baseline, args.threshold)
+    print(f"\ncomparación con {args.baseline} ({baseline['meta']['time']}):")
+    for name, value, ref, change, regression in rows:
+        flag = "  REGRESIÓN" if regression else ""
+        print(f"{name:28s} {change * 100:+7.1f}%{flag}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# buffers.py
+# Almacenamiento compacto de trayectorias largas:
+#   - TrajectoryBuffer: columnas contiguas con dtype configurable (float32 por
+#     defecto) y capacidad acotada, para quien avanza el simulador paso a paso
+#     y guardaba una lista de diccionarios de get_state();
+#   - lttb_indices / downsample: reducción para dibujar (Largest-Triangle-
+#     Three-Buckets) que conserva la forma, los extremos y el apogeo, así que el
+#     coste de dibujar no crece con el número de muestras.
+# Uso:
+#     buf = TrajectoryBuffer(capacity=50_000, on_full="decimate")
+#     while not sim.finished:
+#         sim.step()
+#         buf.append(sim.get_state())
+#     x, y = buf.plot_xy(2000)
+
+import numpy as np
+
+from core import Trajectory
+
+COLUMNS = Trajectory.COLUMNS
+
+
+def _state_row(state):
+    """Fila (t, x, y, vx, vy, ax, ay, kin, pot) de un dict con el formato de get_state()."""
+    x, y = state["pos"]
+    vx, vy = state["vel"]
+    ax, ay = state["acc"]
+    energy = state["energy"]
+    return (state["time"], x, y, vx, vy, ax, ay, energy["kin"], energy["pot"])
+
+
+class TrajectoryBuffer:
+    """
+    Muestras de una trayectoria en un array (columnas, capacity) del dtype dado.
+    Al llenarse, on_full decide:
+        "overwrite": búfer circular, se descartan las muestras más antiguas;
+        "decimate": se queda una de cada dos y a partir de ahí se guarda una de
+                    cada 2, 4, 8... (se conserva todo el vuelo con menos resolución);
+        "error": lanza OverflowError.
+    """
+    def __init__(self, capacity=100_000, dtype=np.float32, mass=1.0, on_full="overwrite"):
+        if on_full not in ("overwrite", "decimate", "error"):
+            raise ValueError(f"on_full desconocido: {on_full!r} (opciones: overwrite, decimate, error)")
+        if capacity < 2:
+            raise ValueError("capacity debe ser al menos 2")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self.mass = float(mass)
+        self.on_full = on_full
+        self._data = np.empty((len(COLUMNS), self.capacity), dtype=self.dtype)
+        self._start = 0          # posición de la muestra más antigua (modo circular)
+        self._n = 0
+        self._stride = 1         # con "decimate": se guarda la muestra k si k % _stride == 0
+        self._count = 0          # muestras recibidas
+        self._last = None        # última muestra recibida si no se guardó (modo "decimate")
+        self.dropped = 0         # muestras descartadas en total
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, state):
+        """Añade un estado con el formato de get_state() / Trajectory.state()."""
+        self.append_row(_state_row(state))
+
+    def append_row(self, row):
+        """Añade una muestra (t, x, y, vx, vy, ax, ay, kin, pot)."""
+        k = self._count
+        self._count += 1
+        if k % self._stride == 0 and self._n == self.capacity:
+            if self.on_full == "error":
+                raise OverflowError(f"TrajectoryBuffer lleno ({self.capacity} muestras)")
+            if self.on_full == "overwrite":
+                # circular: la nueva ocupa el hueco de la más antigua
+                self._data[:, self._start] = row
+                self._start = (self._start + 1) % self.capacity
+                self.dropped += 1
+                return
+            self._decimate()
+        if k % self._stride:
+            # se recuerda para que la última muestra (el impacto) no se pierda
+            self._last = tuple(row)
+            self.dropped += 1
+            return
+        self._last = None
+        self._data[:, (self._start + self._n) % self.capacity] = row
+        self._n += 1
+
+    def _decimate(self):
+        keep = (self._n + 1) // 2
+        self._data[:, :keep] = self._data[:, 0:self._n:2]
+        self.dropped += self._n - keep
+        self._n = keep
+        self._stride *= 2
+
+    def extend(self, traj):
+        """Añade todas las muestras de una Trajectory (o de un array (9, n))."""
+        data = np.asarray(getattr(traj, "data", traj))
+        m = data.shape[1]
+        if self._stride == 1 and self._start == 0 and self._n + m <= self.capacity:
+            # caso habitual: cabe entero, copia en bloque
+            self._data[:, self._n:self._n + m] = data
+            self._n += m
+            self._count += m
+            self._last = None
+            return
+        for row in data.T:
+            self.append_row(row)
+
+    @property
+    def data(self):
+        """
+        Array (columnas, n) en orden temporal: vista si no da la vuelta, copia si
+        la da o si hay que añadir la última muestra recibida (modo "decimate").
+        """
+        end = self._start + self._n
+        if end <= self.capacity:
+            data = self._data[:, self._start:end]
+        else:
+            data = np.concatenate((self._data[:, self._start:], self._data[:, :end - self.capacity]), axis=1)
+        if self._last is not None:
+            data = np.concatenate((data, np.asarray(self._last, dtype=self.dtype)[:, None]), axis=1)
+        return data
+
+    def column(self, name):
+        return self.data[COLUMNS.index(name)]
+
+    def to_trajectory(self):
+        """Copia como core.Trajectory (mismo dtype)."""
+        return Trajectory(self.data.copy(), mass=self.mass)
+
+    def plot_xy(self, n_out=2000):
+        """(x, y) reducidos a unos n_out puntos para dibujar."""
+        data = self.data
+        x, y = data[1], data[2]
+        idx = lttb_indices(x, y, n_out)
+        return x[idx], y[idx]
+
+    def clear(self):
+        self._start = self._n = self._count = self.dropped = 0
+        self._stride = 1
+        self._last = None
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Índices (crecientes) de unos n_out puntos que conservan la forma de la
+    curva (x, y): Largest-Triangle-Three-Buckets, más el primero, el último y
+    los extremos de y (apogeo y punto más bajo), que LTTB puede saltarse.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    buckets = n_out - 2
+    edges = (1 + np.arange(buckets + 1) * (n - 2) / buckets).astype(np.int64)
+    # media de cada cubo (el "tercer vértice" del triángulo con el cubo anterior)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for b in range(buckets):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        # el doble del área del triángulo (a, i, c) para cada i del cubo
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    extremes = (int(np.argmax(y)), int(np.argmin(y)))
+    return np.union1d(out, extremes)
+
+
+def downsample(traj, n_out=2000):
+    """Trajectory con unas n_out muestras elegidas con lttb_indices sobre (x, y)."""
+    idx = lttb_indices(traj.x, traj.y, n_out)
+    return Trajectory(traj.data[:, idx], mass=traj.mass, finished=traj.finished, events=traj.events)
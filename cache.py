@@ -0,0 +1,217 @@
+# cache.py
+# Caché de trayectorias: una ejecución de ProjectileSimulator.run() se guarda
+# con una clave derivada de sus parámetros normalizados (más el integrador y
+# core.ENGINE_VERSION), así que repetir los mismos parámetros cuesta una
+# búsqueda en lugar de una integración.
+# En memoria es un LRU acotado por número de entradas y por bytes; con
+# directory=... además se guarda en disco (.npy que se abre con mmap, más un
+# .json con los eventos) y sobrevive entre sesiones.
+# Uso:
+#     cache = TrajectoryCache(directory="~/.cache/simulador")
+#     tray = cache.run(v0=30, angle_deg=45, cd=0.47)
+#     cache.stats()   # {"hits": ..., "misses": ..., "evictions": ..., ...}
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from core import ENGINE_VERSION, ProjectileSimulator, Trajectory
+
+# parámetros del constructor que no cambian el resultado
+_IGNORED = ("backend",)
+# solo cuentan con el integrador adaptativo
+_ADAPTIVE_ONLY = ("rtol", "atol")
+
+_SIGNATURE = inspect.signature(ProjectileSimulator.__init__)
+
+
+def normalize(**params):
+    """
+    Parámetros completos (con los valores por defecto) en una forma canónica:
+    números como float, -0.0 como 0.0 y sin los que no afectan al resultado.
+    """
+    bound = _SIGNATURE.bind(None, **params)
+    bound.apply_defaults()
+    args = dict(bound.arguments)
+    del args["self"]
+    if args.pop("events"):
+        raise ValueError("las simulaciones con eventos de usuario no se pueden cachear")
+    if args.pop("env") is not None:
+        raise ValueError("las simulaciones con entorno variable no se pueden cachear")
+    for name in _IGNORED:
+        args.pop(name)
+    integrator = args.pop("integrator")
+    if integrator != "rk45":
+        for name in _ADAPTIVE_ONLY:
+            args.pop(name)
+    out = {name: float(value) + 0.0 for name, value in args.items()}
+    out["integrator"] = integrator
+    return out
+
+
+def cache_key(**params):
+    """Clave (hash hexadecimal) de un conjunto de parámetros de ProjectileSimulator."""
+    norm = normalize(**params)
+    text = repr((ENGINE_VERSION, sorted(norm.items())))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class TrajectoryCache:
+    """
+    Caché LRU de Trajectory con persistencia opcional en disco.
+    max_entries / max_bytes limitan lo que se guarda en memoria; al superarse se
+    descartan las trayectorias usadas hace más tiempo (siguen en disco si lo hay).
+    Las trayectorias devueltas son compartidas y de solo lectura.
+    """
+    def __init__(self, max_entries=256, max_bytes=256 * 2**20, directory=None):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.directory = os.path.expanduser(directory) if directory else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.directory is not None
+                                        and os.path.exists(self._path(key, ".npy")))
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    def get(self, key):
+        """Trayectoria guardada con esa clave, o None (cuenta acierto o fallo)."""
+        with self._lock:
+            traj = self._entries.get(key)
+            if traj is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return traj
+        traj = self._load(key)
+        with self._lock:
+            if traj is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, traj)
+        return traj
+
+    def put(self, key, traj):
+        """
+        Guarda traj y devuelve la trayectoria guardada, de solo lectura. Si
+        traj.data es una vista de un buffer mayor (run() puede dejar así hasta
+        la mitad del buffer sin usar) se guarda una copia compacta, para que
+        max_bytes cuente la memoria que de verdad se retiene.
+        """
+        base = traj.data.base
+        if isinstance(base, np.ndarray) and base.nbytes > traj.data.nbytes:
+            traj = Trajectory(traj.data.copy(), mass=traj.mass, finished=traj.finished, events=traj.events)
+        traj.data.flags.writeable = False
+        for name in Trajectory.COLUMNS:
+            getattr(traj, name).flags.writeable = False
+        with self._lock:
+            self._remember(key, traj)
+        if self.directory:
+            self._store(key, traj)
+        return traj
+
+    def _remember(self, key, traj):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.data.nbytes
+        self._entries[key] = traj
+        self._bytes += traj.data.nbytes
+        # siempre se conserva la última, aunque sola supere max_bytes
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self._bytes > self.max_bytes):
+            _, dropped = self._entries.popitem(last=False)
+            self._bytes -= dropped.data.nbytes
+            self.evictions += 1
+
+    def _store(self, key, traj):
+        # se escribe en un temporal y se renombra: nunca queda un fichero a medias
+        meta = {"mass": traj.mass, "finished": traj.finished, "events": traj.events}
+        tmp = self._path(key, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(key, ".json"))
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(traj.data))
+        os.replace(tmp, self._path(key, ".npy"))
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key, ".json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            data = np.load(self._path(key, ".npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if data.ndim != 2 or data.shape[0] != len(Trajectory.COLUMNS):
+            return None
+        for record in meta["events"]:
+            record["pos"] = tuple(record["pos"])
+            record["vel"] = tuple(record["vel"])
+        return Trajectory(data, mass=meta["mass"], finished=meta["finished"], events=meta["events"])
+
+    def run(self, **params):
+        """ProjectileSimulator(**params).run(), o la trayectoria guardada si ya se calculó."""
+        key = cache_key(**params)
+        traj = self.get(key)
+        if traj is None:
+            traj = self.put(key, ProjectileSimulator(**params).run())
+        return traj
+
+    def clear(self, disk=False):
+        """Vacía la memoria (y con disk=True también los ficheros del directorio)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith((".npy", ".json")):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        """Contadores de uso: aciertos, fallos, descartes, aciertos en disco, tamaño."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_default = None
+
+
+def default_cache():
+    """Caché compartida del proceso (solo en memoria)."""
+    global _default
+    if _default is None:
+        _default = TrajectoryCache()
+    return _default
+
+
+def cached_run(**params):
+    """Atajo: default_cache().run(**params)."""
+    return default_cache().run(**params)
@@ -0,0 +1,100 @@
+# checkpoint.py
+# Instantáneas del estado de un ProjectileSimulator en un registro binario de
+# tamaño fijo (un array estructurado de NumPy, STATE_DTYPE, 164 bytes): se
+# guardan con save() en un .npy, se recuperan con load() y restore() crea un
+# simulador que sigue exactamente igual que el original (mismos pasos, mismos
+# resultados bit a bit).
+# Para ramificar un vuelo en memoria no hace falta pasar por aquí: sim.fork().
+# Uso:
+#     previo = sim.run(until=5.0)
+#     save("vuelo.npy", [snapshot(sim)])
+#     sim2 = restore(load("vuelo.npy")[0])
+#     tray = join(previo, sim2.run())       # igual que sim.run() sin pausa
+
+import math
+
+import numpy as np
+
+from core import ENGINE_VERSION, ProjectileSimulator, Trajectory
+
+STATE_DTYPE = np.dtype([
+    ("engine", "<u2"),          # core.ENGINE_VERSION con la que se tomó
+    ("integrator", "S16"),
+    ("finished", "?"),
+    ("landed", "?"),            # terminó en el suelo: el estado es el impacto
+    # estado
+    ("t", "<f8"), ("x", "<f8"), ("y", "<f8"), ("vx", "<f8"), ("vy", "<f8"),
+    ("h", "<f8"),               # paso actual del integrador adaptativo
+    # parámetros
+    ("v0", "<f8"), ("angle", "<f8"), ("mass", "<f8"), ("area", "<f8"), ("cd", "<f8"),
+    ("wind", "<f8"), ("g", "<f8"), ("rho", "<f8"), ("dt", "<f8"), ("max_time", "<f8"),
+    ("rtol", "<f8"), ("atol", "<f8"),
+])
+
+_STATE = ("t", "x", "y", "vx", "vy")
+_PARAMS = ("v0", "angle", "mass", "area", "cd", "wind", "g", "rho", "dt", "max_time", "rtol", "atol")
+
+
+def snapshot(sim):
+    """
+    Registro (np.void de STATE_DTYPE) con el estado y los parámetros de sim.
+    No incluye el entorno ni los eventos de usuario (son funciones): restore()
+    los recibe de nuevo. Del registro de eventos solo se conserva el impacto.
+    """
+    record = np.zeros((), dtype=STATE_DTYPE)
+    record["engine"] = ENGINE_VERSION
+    record["integrator"] = sim.integrator.encode()
+    record["finished"] = sim.finished
+    record["landed"] = sim.impact is not None
+    for name in _STATE + _PARAMS:
+        record[name] = getattr(sim, name)
+    record["h"] = sim._h
+    return record[()]
+
+
+def restore(record, events=None, env=None, backend="auto"):
+    """ProjectileSimulator en el estado de record (de snapshot() o load())."""
+    if int(record["engine"]) != ENGINE_VERSION:
+        raise ValueError(f"instantánea de otra versión del motor: {int(record['engine'])} "
+                         f"(actual: {ENGINE_VERSION})")
+    p = {name: float(record[name]) for name in _PARAMS}
+    sim = ProjectileSimulator(v0=p["v0"], angle_deg=math.degrees(p["angle"]), mass=p["mass"],
+                              area=p["area"], cd=p["cd"], wind=p["wind"], g=p["g"], rho=p["rho"],
+                              dt=p["dt"], max_time=p["max_time"], integrator=record["integrator"].decode(),
+                              rtol=p["rtol"], atol=p["atol"], events=events, backend=backend, env=env)
+    sim.angle = p["angle"]
+    sim.t, sim.x, sim.y, sim.vx, sim.vy = (float(record[name]) for name in _STATE)
+    sim._h = float(record["h"])
+    sim.finished = bool(record["finished"])
+    sim._event_values = [ev(sim.t, sim.x, sim.y, sim.vx, sim.vy) for ev in sim.events]
+    if record["landed"]:
+        sim.impact = {"name": "ground", "time": sim.t, "pos": (sim.x, sim.y), "vel": (sim.vx, sim.vy)}
+        sim.event_log.append(sim.impact)
+    return sim
+
+
+def save(path, records):
+    """Guarda registros de snapshot() (una secuencia o un array de STATE_DTYPE) en un .npy."""
+    np.save(path, np.array(list(records), dtype=STATE_DTYPE))
+
+
+def load(path):
+    """Array de registros STATE_DTYPE guardado con save()."""
+    records = np.load(path)
+    if records.dtype != STATE_DTYPE:
+        raise ValueError(f"{path} no contiene instantáneas del simulador")
+    return records
+
+
+def join(prefix, suffix):
+    """
+    Trajectory con prefix seguida de suffix (de run(until=...) y el run()
+    siguiente, o de un fork); la primera muestra de suffix, que repite la
+    última de prefix, no se duplica. Los eventos son los de suffix, que ya
+    incluyen los anteriores.
+    """
+    data = suffix.data
+    if len(prefix) and len(suffix) and suffix.t[0] == prefix.t[-1]:
+        data = data[:, 1:]
+    return Trajectory(np.concatenate((prefix.data, data), axis=1), mass=suffix.mass,
+                      finished=suffix.finished, events=list(suffix.events))
@@ -0,0 +1,162 @@
+# compare.py
+# Comparación de familias de trayectorias (abanicos de ángulos, barridos de
+# viento...) en una misma gráfica:
+#   - batch_paths: integra un lote con BatchProjectileSimulator guardando la
+#     posición de cada proyectil a intervalos regulares (un número fijo de
+#     muestras por curva, sea cual sea dt);
+#   - CurveSet: todas las curvas en una sola LineCollection de Matplotlib. Se
+#     añaden y quitan por grupos sin limpiar los ejes, y cada curva se reduce a
+#     unos pocos puntos por píxel del ancho de los ejes, así que dibujar mil
+#     curvas cuesta lo mismo con dt = 0.01 que con dt = 0.0001.
+# Uso:
+#     curves = CurveSet(ax)
+#     x, y, n = batch_paths(v0=40, angle_deg=np.linspace(5, 85, 500))
+#     key = curves.add(x, y, n)
+#     curves.remove(key)
+
+import itertools
+
+import numpy as np
+
+from core import BatchProjectileSimulator
+
+
+def batch_paths(samples=512, **params):
+    """
+    (x, y, lengths) de un lote con los parámetros de BatchProjectileSimulator:
+    x[i] e y[i] son posiciones del proyectil i a intervalos regulares de pasos
+    (tras el impacto se repite el punto de impacto) y lengths[i] cuántas son
+    válidas, la última el impacto. Se guardan como mucho samples + 1 por
+    curva, sea cual sea dt: cuando se llenan se descarta una de cada dos y el
+    intervalo se dobla, así que quedan entre samples / 2 y samples.
+    """
+    samples = max(2, int(samples) // 2 * 2)
+    batch = BatchProjectileSimulator(**params)
+    xs = np.empty((batch.n, samples + 1))
+    ys = np.empty((batch.n, samples + 1))
+    xs[:, 0] = batch.x
+    ys[:, 0] = batch.y
+    last = np.ones(batch.n, dtype=np.int64)    # muestras guardadas de cada uno
+    count, stride, steps = 1, 1, 0
+    while batch.n_active:
+        batch.step()
+        steps += 1
+        if steps % stride:
+            continue
+        if count == samples:
+            xs[:, :samples // 2] = xs[:, :samples:2]
+            ys[:, :samples // 2] = ys[:, :samples:2]
+            last = (last + 1) // 2
+            count, stride = samples // 2, 2 * stride
+        rows, x, y = batch.live_positions()
+        xs[rows, count] = x
+        ys[rows, count] = y
+        last[rows] = count + 1
+        count += 1
+    # el impacto (ya resuelto) detrás de la última muestra en vuelo
+    lengths = last + 1
+    width = int(lengths.max())
+    after = np.arange(width) >= last[:, None]
+    return (np.where(after, batch.x[:, None], xs[:, :width]),
+            np.where(after, batch.y[:, None], ys[:, :width]), lengths)
+
+
+class CurveSet:
+    """
+    Curvas superpuestas en una sola LineCollection de ax. add() devuelve una
+    clave con la que remove() quita el grupo entero; ninguno de los dos limpia
+    los ejes. Cada curva se dibuja con como mucho points_per_px puntos por
+    píxel del ancho de los ejes, tomados a intervalos regulares de tiempo
+    (set_resolution los recalcula si cambia el tamaño). Tras ax.clear(),
+    attach(ax) vuelve a añadir la colección.
+    """
+    def __init__(self, ax, points_per_px=0.5, linewidth=0.8, alpha=0.6, colors="tab10"):
+        from matplotlib import colormaps
+        self.points_per_px = float(points_per_px)
+        self.style = dict(linewidths=linewidth, alpha=alpha)
+        self._palette = colormaps[colors]
+        self._groups = {}       # clave -> [x, y, lengths, rgba, segmentos]
+        self._keys = itertools.count()
+        self._n_points = None
+        self.collection = None
+        self.attach(ax)
+
+    def __len__(self):
+        return sum(len(g[2]) for g in self._groups.values())
+
+    @property
+    def keys(self):
+        return list(self._groups)
+
+    def attach(self, ax):
+        """Añade la colección (con las curvas actuales) a ax."""
+        from matplotlib.collections import LineCollection
+        self.ax = ax
+        self.collection = LineCollection([], **self.style)
+        ax.add_collection(self.collection, autolim=False)
+        self._n_points = self._resolution()
+        for group in self._groups.values():
+            group[4] = self._decimate(*group[:3])
+        self._update()
+
+    def _resolution(self):
+        return max(16, int(self.ax.bbox.width * self.points_per_px))
+
+    def _decimate(self, x, y, lengths):
+        """Segmentos (N, n, 2): n muestras de cada curva repartidas entre su primera y su última."""
+        n = min(self._n_points, int(lengths.max()))
+        idx = np.rint(np.linspace(0.0, 1.0, n) * (lengths[:, None] - 1)).astype(np.intp)
+        return np.stack((np.take_along_axis(x, idx, 1), np.take_along_axis(y, idx, 1)), axis=-1)
+
+    def _update(self):
+        groups = self._groups.values()
+        self.collection.set_segments([seg for g in groups for seg in g[4]])
+        self.collection.set_color(np.concatenate([g[3] for g in groups]) if self._groups else [])
+
+    def add(self, x, y, lengths=None, color=None):
+        """
+        Añade un grupo de curvas (x e y de forma (N, muestras), o una sola curva
+        1-D) y devuelve su clave. lengths da las muestras válidas de cada curva
+        (por defecto todas); color es un color para todo el grupo o uno por
+        curva (por defecto, el siguiente de la paleta).
+        """
+        from matplotlib.colors import to_rgba_array
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        y = np.atleast_2d(np.asarray(y, dtype=float))
+        if x.shape != y.shape:
+            raise ValueError(f"x e y deben tener la misma forma: {x.shape} != {y.shape}")
+        if lengths is None:
+            lengths = np.full(x.shape[0], x.shape[1], dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        key = next(self._keys)
+        rgba = to_rgba_array(self._palette(key % self._palette.N) if color is None else color)
+        rgba = np.broadcast_to(rgba, (x.shape[0], 4))
+        self._groups[key] = [x, y, lengths, rgba, self._decimate(x, y, lengths)]
+        self._update()
+        return key
+
+    def remove(self, key):
+        del self._groups[key]
+        self._update()
+
+    def clear(self):
+        self._groups.clear()
+        self._update()
+
+    def set_resolution(self):
+        """Vuelve a reducir las curvas si ha cambiado el ancho de los ejes; True si ha cambiado."""
+        n = self._resolution()
+        if n == self._n_points:
+            return False
+        self._n_points = n
+        for group in self._groups.values():
+            group[4] = self._decimate(*group[:3])
+        self._update()
+        return True
+
+    def extent(self):
+        """(x máximo, y máximo) de todas las curvas (0 sin curvas)."""
+        if not self._groups:
+            return 0.0, 0.0
+        return (max(float(g[0].max()) for g in self._groups.values()),
+                max(float(g[1].max()) for g in self._groups.values()))
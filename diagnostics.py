@@ -0,0 +1,200 @@
+# diagnostics.py
+# Diagnóstico de precisión por balance de energía: con arrastre, la energía
+# mecánica (K + P) solo cambia por el trabajo de la fuerza de arrastre,
+#     (K + P)(t) - (K + P)(0) = ∫ F_arrastre · v dt,
+# así que la diferencia entre ambos lados (el residuo) mide el error de la
+# integración. Se calcula sobre las columnas que ya guarda Trajectory (la
+# potencia del arrastre sale de a + g), en una pasada vectorizada, o muestra a
+# muestra con EnergyMonitor para quien avanza el simulador con step().
+# El balance no ve un paso que se sale del suelo en el primer intento (el
+# impacto interpolado oculta la divergencia), así que además se vigila la
+# rigidez del arrastre: con Euler y Euler semi-implícito, un paso h es estable
+# si h * 2|a_arrastre|/|v_rel| < 2.
+# recommend_dt busca el mayor dt con el que el residuo relativo no pasa de
+# una tolerancia, en lugar de usar un dt pequeño "por si acaso".
+# Uso:
+#     bal = energy_balance(ProjectileSimulator(v0=40, dt=0.01).run(), g=9.81)
+#     bal.max_residual, bal.ok
+#     rec = recommend_dt(tol=1e-3, v0=40, angle_deg=30, cd=0.47)
+#     rec["dt"], rec["trajectory"]
+
+import math
+
+import numpy as np
+
+from core import ProjectileSimulator
+
+# residuo relativo a partir del cual se considera que la integración ha divergido
+BLOWUP = 0.05
+
+
+class EnergyBalance:
+    """
+    Balance de energía de una trayectoria: residual (J) y relative (dividido
+    por la energía inicial) en cada muestra, drag_work (trabajo acumulado del
+    arrastre, J), max_residual (máximo de |relative|; inf si hay valores no
+    finitos) y blowup_time (primer instante con |relative| > blowup o no
+    finito; None si no lo hay). step_ratio es el mayor h * 2|a_arrastre|/|v_rel|
+    de los pasos: por encima de 2 el paso es inestable y también cuenta como divergencia.
+    """
+    def __init__(self, t, residual, drag_work, e0, blowup=BLOWUP):
+        self.t = t
+        self.residual = residual
+        self.drag_work = drag_work
+        self.e0 = e0
+        self.relative = residual / (e0 if e0 > 0.0 else 1.0)
+        bad = ~np.isfinite(self.relative)
+        self.max_residual = math.inf if bad.any() else float(np.abs(self.relative).max(initial=0.0))
+        bad |= np.abs(self.relative) > blowup
+        self.blowup_time = float(t[np.argmax(bad)]) if bad.any() else None
+        self.step_ratio = 0.0
+
+    @property
+    def ok(self):
+        return self.blowup_time is None
+
+
+def energy_balance(traj, g=9.81, wind=0.0, dt=None, blowup=BLOWUP):
+    """
+    EnergyBalance de traj (de ProjectileSimulator con g y viento constantes).
+    El trabajo del arrastre se integra con la regla del trapecio sobre las
+    muestras. dt es el paso del integrador para step_ratio; sin él se usa la
+    separación entre muestras, que en el último paso (el impacto interpolado)
+    es menor que el paso que realmente se dio.
+    """
+    m = traj.mass
+    drag_y = traj.ay + g
+    power = m * (traj.ax * traj.vx + drag_y * traj.vy)
+    h = np.diff(traj.t)
+    work = np.zeros(len(traj))
+    np.cumsum(0.5 * (power[1:] + power[:-1]) * h, out=work[1:])
+    energy = traj.kin + traj.pot
+    e0 = float(energy[0]) if len(traj) else 0.0
+    bal = EnergyBalance(traj.t, energy - e0 - work, work, e0, blowup)
+    ratio = (h if dt is None else dt) * _stiffness(traj.ax[:-1], drag_y[:-1], traj.vx[:-1] - wind, traj.vy[:-1])
+    bal.step_ratio = float(ratio.max(initial=0.0))
+    if bal.step_ratio > 2.0:
+        t_bad = float(traj.t[np.argmax(ratio > 2.0)])
+        bal.blowup_time = t_bad if bal.blowup_time is None else min(bal.blowup_time, t_bad)
+    return bal
+
+
+def _stiffness(drag_x, drag_y, vrel_x, vrel_y):
+    """2|a_arrastre| / |v_rel|: derivada de la aceleración del arrastre cuadrático respecto de la velocidad."""
+    vrel = np.sqrt(vrel_x * vrel_x + vrel_y * vrel_y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vrel > 0.0, 2.0 * np.sqrt(drag_x * drag_x + drag_y * drag_y) / vrel, 0.0)
+
+
+class EnergyMonitor:
+    """
+    El mismo balance, muestra a muestra y sin guardar historial: update(sim)
+    tras cada step() (evalúa la aceleración en el estado nuevo) o
+    update_sample(t, vx, vy, ax, ay, kin, pot). Mantiene residual,
+    max_residual, step_ratio, blowup_time y ok como EnergyBalance; dt como en
+    energy_balance (update(sim) usa sim.dt).
+    """
+    def __init__(self, mass, g=9.81, wind=0.0, dt=None, blowup=BLOWUP):
+        self.mass = float(mass)
+        self.dt = dt
+        self.g = float(g)
+        self.wind = float(wind)
+        self.blowup = float(blowup)
+        self.drag_work = 0.0
+        self.residual = 0.0
+        self.max_residual = 0.0
+        self.step_ratio = 0.0
+        self.blowup_time = None
+        self.samples = 0
+        self._e0 = None
+        self._last = None       # (t, potencia, rigidez) de la muestra anterior
+
+    @property
+    def ok(self):
+        return self.blowup_time is None
+
+    def update_sample(self, t, vx, vy, ax, ay, kin, pot):
+        drag_y = ay + self.g
+        power = self.mass * (ax * vx + drag_y * vy)
+        stiffness = float(_stiffness(ax, drag_y, vx - self.wind, vy))
+        if self._last is None:
+            self._e0 = kin + pot
+        else:
+            t0, p0, s0 = self._last
+            self.drag_work += 0.5 * (power + p0) * (t - t0)
+            ratio = (t - t0 if self.dt is None else self.dt) * s0
+            if ratio > self.step_ratio:
+                self.step_ratio = ratio
+            if ratio > 2.0 and self.blowup_time is None:
+                self.blowup_time = t0
+        self._last = (t, power, stiffness)
+        self.samples += 1
+        self.residual = kin + pot - self._e0 - self.drag_work
+        rel = abs(self.residual) / (self._e0 if self._e0 > 0.0 else 1.0)
+        if not math.isfinite(rel):
+            rel = math.inf
+        if rel > self.max_residual:
+            self.max_residual = rel
+        if rel > self.blowup and self.blowup_time is None:
+            self.blowup_time = t
+
+    def update(self, sim):
+        if self.dt is None:
+            self.dt = sim.dt
+        ax, ay = sim.acceleration()
+        self.update_sample(sim.t, sim.vx, sim.vy, ax, ay, sim.kinetic_energy(), sim.potential_energy())
+
+
+def recommend_dt(tol=1e-3, dt=0.01, max_runs=8, **params):
+    """
+    Mayor dt (aproximadamente) con el que el residuo relativo máximo del
+    balance de energía no pasa de tol, para ProjectileSimulator(**params).
+    Integra con dt y dt / 2 para estimar el orden p del error (residuo ~ C dt^p)
+    y a partir de ahí predice y comprueba, como mucho max_runs simulaciones en
+    total. Devuelve un diccionario con dt, residual (el comprobado), order,
+    runs y trajectory (la de ese dt: no hace falta volver a integrar).
+    El residuo mide el error de la integración en su conjunto, no el de una
+    magnitud concreta (alcance, apogeo...), y también incluye el de la
+    cuadratura del trapecio (del orden de dt²), así que con integradores de
+    orden alto la recomendación es conservadora. Si ningún dt probado cumple
+    tol, lanza ValueError. Solo para integradores de paso fijo.
+    """
+    if tol <= 0.0:
+        raise ValueError("tol debe ser positiva")
+    if params.get("integrator") == "rk45":
+        raise ValueError("rk45 ya elige el paso (rtol, atol); recommend_dt es para los de paso fijo")
+    g = params.get("g", 9.81)
+    tried = []
+
+    def attempt(h):
+        traj = ProjectileSimulator(dt=h, **params).run()
+        bal = energy_balance(traj, g, params.get("wind", 0.0), dt=h)
+        tried.append((h, bal.max_residual if bal.ok else math.inf, traj))
+        return tried[-1][1]
+
+    r1 = attempt(dt)
+    r2 = attempt(0.5 * dt)
+    order = 1.0
+    if 0.0 < r2 < r1 < math.inf:
+        order = min(4.0, max(1.0, math.log2(r1 / r2)))
+    # no más de un décimo del vuelo por paso
+    h_max = 0.1 * max(tried[0][2].flight_time, dt)
+    h, r = tried[-1][:2]
+    while len(tried) < max_runs:
+        if r == 0.0:
+            h_new = h_max
+        elif math.isfinite(r):
+            h_new = min(h_max, 0.9 * h * (tol / r) ** (1.0 / order))
+        else:
+            h_new = 0.25 * h
+        ok = [x for x in tried if x[1] <= tol]
+        best = max(ok, key=lambda x: x[0]) if ok else None
+        if best is not None and (h_new <= 1.05 * best[0] or best[1] >= 0.5 * tol):
+            break
+        h, r = h_new, attempt(h_new)
+    ok = [x for x in tried if x[1] <= tol]
+    if not ok:
+        raise ValueError(f"ningún dt probado cumple tol={tol:g} (el menor, {min(x[0] for x in tried):g} s, "
+                         f"da {min(x[1] for x in tried):.3g})")
+    h, r, traj = max(ok, key=lambda x: x[0])
+    return {"dt": h, "residual": r, "order": order, "runs": len(tried), "trajectory": traj}
@@ -0,0 +1,288 @@
+# environment.py
+# Entorno y aerodinámica variables: densidad, viento, gravedad y velocidad del
+# sonido en función de la altura, ráfagas en función del tiempo y Cd en
+# función del número de Mach.
+# Cada modelo se evalúa una sola vez, al crear el entorno, en una rejilla
+# uniforme; durante la integración solo se interpola linealmente en esas
+# tablas (un índice y unas multiplicaciones, sin exp/pow por paso), tanto en
+# ProjectileSimulator como, vectorizado, en BatchProjectileSimulator.
+# Uso:
+#     env = Environment(rho=isa_density, wind=power_law_wind(5.0), cd_mach=([0, 0.8, 1.0, 1.2, 3], [0.47, 0.5, 0.8, 0.95, 0.9]))
+#     sim = ProjectileSimulator(v0=300, angle_deg=40, env=env)
+
+import math
+
+import numpy as np
+
+# atmósfera estándar internacional (ISA) hasta 20 km
+_T0 = 288.15            # K
+_P0 = 101325.0          # Pa
+_LAPSE = 0.0065         # K/m en la troposfera
+_R_AIR = 287.05287      # J/(kg K)
+_GAMMA = 1.4
+_H_TROPO = 11000.0
+_T_TROPO = _T0 - _LAPSE * _H_TROPO
+_P_TROPO = _P0 * (_T_TROPO / _T0) ** (9.80665 / (_R_AIR * _LAPSE))
+_R_EARTH = 6371000.0
+
+
+def isa_temperature(h):
+    h = np.asarray(h, dtype=float)
+    return np.where(h < _H_TROPO, _T0 - _LAPSE * h, _T_TROPO)
+
+
+def isa_pressure(h):
+    h = np.asarray(h, dtype=float)
+    tropo = _P0 * (isa_temperature(h) / _T0) ** (9.80665 / (_R_AIR * _LAPSE))
+    strato = _P_TROPO * np.exp(-9.80665 * (h - _H_TROPO) / (_R_AIR * _T_TROPO))
+    return np.where(h < _H_TROPO, tropo, strato)
+
+
+def isa_density(h):
+    """Densidad del aire ISA (kg/m³) a la altura h (m): 1.225 al nivel del mar."""
+    return isa_pressure(h) / (_R_AIR * isa_temperature(h))
+
+
+def isa_sound_speed(h):
+    """Velocidad del sonido ISA (m/s): 340.3 al nivel del mar."""
+    return np.sqrt(_GAMMA * _R_AIR * isa_temperature(h))
+
+
+def inverse_square_gravity(g0=9.81):
+    """g(h) = g0 * (R / (R + h))²."""
+    return lambda h: g0 * (_R_EARTH / (_R_EARTH + np.asarray(h, dtype=float))) ** 2
+
+
+def power_law_wind(v_ref, h_ref=10.0, alpha=1.0 / 7.0):
+    """Perfil de viento v(h) = v_ref * (h / h_ref)^alpha (0 en el suelo)."""
+    def wind(h):
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        return v_ref * (h / h_ref) ** alpha
+    return wind
+
+
+def from_points(xs, ys):
+    """Modelo interpolado linealmente entre puntos (xs crecientes); constante fuera."""
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    return lambda x: np.interp(x, xs, ys)
+
+
+def _as_model(spec):
+    """Número, función vectorizada o par (xs, ys) de puntos -> función vectorizada."""
+    if spec is None or callable(spec):
+        return spec
+    if isinstance(spec, tuple) and len(spec) == 2:
+        return from_points(*spec)
+    value = float(spec)
+    return lambda x: np.full(np.shape(x), value)
+
+
+class UniformTable:
+    """
+    Una o varias columnas muestreadas en x0, x0 + dx, ... con interpolación
+    lineal (constante fuera del intervalo). Llamada con un array devuelve
+    (columnas, N); scalar_index da (i, w) para interpolar a mano sobre listas.
+    """
+    def __init__(self, x0, dx, values):
+        self.x0 = float(x0)
+        self.dx = float(dx)
+        self.values = np.atleast_2d(np.asarray(values, dtype=float))
+        self.slopes = np.diff(self.values, axis=1)
+        self.last = self.values.shape[1] - 1
+        self.inv_dx = 1.0 / self.dx
+
+    @classmethod
+    def sample(cls, funcs, x0, x1, dx):
+        """Tabla con las funciones funcs evaluadas en la rejilla [x0, x1] de paso dx."""
+        n = int(math.ceil((x1 - x0) / dx)) + 1
+        grid = x0 + dx * np.arange(n)
+        return cls(x0, dx, [np.broadcast_to(f(grid), grid.shape) for f in funcs])
+
+    def scalar_index(self, x):
+        p = (x - self.x0) * self.inv_dx
+        if p <= 0.0:
+            return 0, 0.0
+        if p < self.last:
+            i = int(p)
+            return i, p - i
+        return self.last - 1, 1.0
+
+    def __call__(self, x):
+        p = (np.asarray(x, dtype=float) - self.x0) * self.inv_dx
+        np.clip(p, 0.0, self.last, out=p)
+        i = np.minimum(p.astype(np.intp), self.last - 1)
+        p -= i
+        return self.values[:, i] + self.slopes[:, i] * p
+
+    def locate(self, x, i, w):
+        """Índices (en i, enteros) y pesos (en w) de interpolación de x, sin temporales."""
+        np.subtract(x, self.x0, out=w)
+        w *= self.inv_dx
+        np.clip(w, 0.0, self.last, out=w)
+        np.copyto(i, w, casting="unsafe")
+        np.minimum(i, self.last - 1, out=i)
+        w -= i
+
+    def column(self, c, i, w, out, tmp):
+        """Columna c interpolada en los puntos de locate, escrita en out (tmp: auxiliar)."""
+        np.take(self.slopes[c], i, out=out)
+        out *= w
+        np.take(self.values[c], i, out=tmp)
+        out += tmp
+        return out
+
+
+class Environment:
+    """
+    Modelos del entorno. rho, wind, g y sound_speed dependen de la altura y
+    gust del tiempo; cd_mach da Cd en función del Mach (velocidad relativa al
+    aire / velocidad del sonido). Cada uno puede ser None (se usa el valor
+    constante del simulador), un número, una función vectorizada o un par
+    (xs, ys) de puntos para interpolar. Con cd_mach, sound_speed por defecto es el de la ISA.
+    Las tablas cubren alturas [0, h_max] con paso dh, tiempos [0, t_max] con
+    paso dt_gust y Mach [0, mach_max] con paso dmach; fuera se usa el extremo.
+    """
+    ALTITUDE = ("rho", "wind", "g", "sound_speed")
+
+    def __init__(self, rho=None, wind=None, g=None, sound_speed=None, gust=None, cd_mach=None,
+                 h_max=20000.0, dh=5.0, t_max=300.0, dt_gust=0.01, mach_max=5.0, dmach=0.005):
+        if cd_mach is not None and sound_speed is None:
+            sound_speed = isa_sound_speed
+        self.models = {name: _as_model(spec) for name, spec in
+                       zip(self.ALTITUDE, (rho, wind, g, sound_speed))}
+        self.h_max = float(h_max)
+        self.dh = float(dh)
+        # columnas de altura con modelo propio (el resto sale del simulador)
+        self.altitude_columns = tuple(name for name in self.ALTITUDE if self.models[name] is not None)
+        self.altitude = (UniformTable.sample([self.models[n] for n in self.altitude_columns], 0.0, h_max, dh)
+                         if self.altitude_columns else None)
+        gust = _as_model(gust)
+        self.gust = UniformTable.sample([gust], 0.0, t_max, dt_gust) if gust is not None else None
+        cd_mach = _as_model(cd_mach)
+        self.cd_mach = UniformTable.sample([cd_mach], 0.0, mach_max, dmach) if cd_mach is not None else None
+
+        # tablas como listas para scalar_accel (indexar listas es más rápido que
+        # arrays), construidas una vez y compartidas por todos los simuladores
+        self._alt_lists = ({name: (v.tolist(), s.tolist()) for name, v, s in
+                            zip(self.altitude_columns, self.altitude.values, self.altitude.slopes)}
+                           if self.altitude is not None else {})
+        self._gust_lists = ((self.gust.values[0].tolist(), self.gust.slopes[0].tolist())
+                            if self.gust is not None else None)
+        self._cd_lists = ((self.cd_mach.values[0].tolist(), self.cd_mach.slopes[0].tolist())
+                          if self.cd_mach is not None else None)
+        self._zeros = [0.0] * int(math.ceil(self.h_max / self.dh))
+
+    def _constant_lists(self, value):
+        """Listas (valores, pendientes) de una columna de altura constante."""
+        return [float(value)] * (len(self._zeros) + 1), self._zeros
+
+    def scalar_accel(self, rho, wind, g, cd, area, mass):
+        """
+        Función accel(t, x, y, vx, vy) -> (ax, ay) de un proyectil, con las
+        constantes del simulador para lo que el entorno no modela. Todas las
+        magnitudes de altura salen de las mismas listas (un índice por llamada);
+        las de los modelos se construyen una sola vez, en __init__.
+        """
+        (R, dR), (W, dW), (G, dG), (A, dA) = (self._alt_lists.get(name) or self._constant_lists(v)
+                                              for name, v in zip(self.ALTITUDE, (rho, wind, g, 340.29)))
+        inv_dh, last = 1.0 / self.dh, len(dR)
+        gust = self.gust
+        if gust is not None:
+            GU, dGU = self._gust_lists
+        cdm = self.cd_mach
+        if cdm is not None:
+            CD, dCD = self._cd_lists
+        m = mass
+
+        # mismas operaciones y en el mismo orden que BatchProjectileSimulator con
+        # batch_terms, así que ambos caminos coinciden bit a bit
+        def accel(t, x, y, vx, vy):
+            p = y * inv_dh
+            if p <= 0.0:
+                i, w = 0, 0.0
+            elif p < last:
+                i = int(p)
+                w = p - i
+            else:
+                i, w = last - 1, 1.0
+            wind = W[i] + dW[i] * w
+            if gust is not None:
+                j, u = gust.scalar_index(t)
+                wind += GU[j] + dGU[j] * u
+            vrel_x = vx - wind
+            vrel = math.sqrt(vrel_x * vrel_x + vy * vy)
+            mg = m * (G[i] + dG[i] * w)
+            if vrel == 0:
+                return 0.0, -mg / m
+            c = cd
+            if cdm is not None:
+                j, u = cdm.scalar_index(vrel / (A[i] + dA[i] * w))
+                c = CD[j] + dCD[j] * u
+            Fd = 0.5 * (R[i] + dR[i] * w) * c * area * vrel * vrel
+            return -Fd * (vrel_x / vrel) / m, (-Fd * (vy / vrel) - mg) / m
+
+        return accel
+
+    def batch_evaluator(self, rho, wind, g, cd, area, mass):
+        """
+        Función terms(t, y, vx, vy) -> (viento, k = 0.5 * rho * Cd * A, m * g)
+        para BatchProjectileSimulator._accel; rho, wind, g, cd, area y mass son
+        los arrays constantes del conjunto de proyectiles, usados donde el
+        entorno no tiene modelo. Solo se interpolan las columnas que hacen
+        falta, en arrays reservados aquí: cada llamada sobrescribe los
+        resultados de la anterior.
+        """
+        n = np.size(mass)
+        alt, gust, cdm = self.altitude, self.gust, self.cd_mach
+        cols = {name: c for c, name in enumerate(self.altitude_columns)
+                if name != "sound_speed" or cdm is not None}
+        i = np.empty(n, dtype=np.intp)
+        u = np.empty(n)
+        tmp = np.empty(n)
+        out = {name: np.empty(n) for name in cols}
+        # lo que no depende del entorno se calcula una vez
+        w = out["wind"] if "wind" in cols else (wind if gust is None else np.empty(n))
+        half_rho = 0.5 * rho
+        k = np.empty(n) if "rho" in cols or cdm is not None else half_rho * cd * area
+        mg = np.empty(n) if "g" in cols else mass * g
+        if gust is not None:
+            gust_value = np.empty(n)
+        if cdm is not None:
+            cd = np.empty(n)
+            mach = np.empty(n)
+
+        def terms(t, y, vx, vy):
+            if cols:
+                alt.locate(y, i, u)
+                for name, c in cols.items():
+                    alt.column(c, i, u, out[name], tmp)
+            if gust is not None:
+                gust.locate(t, i, u)
+                gust.column(0, i, u, gust_value, tmp)
+                np.add(out["wind"] if "wind" in cols else wind, gust_value, out=w)
+            if cdm is not None:
+                np.subtract(vx, w, out=mach)
+                np.multiply(mach, mach, out=mach)
+                np.multiply(vy, vy, out=tmp)
+                np.add(mach, tmp, out=mach)
+                np.sqrt(mach, out=mach)
+                np.divide(mach, out["sound_speed"], out=mach)
+                cdm.locate(mach, i, u)
+                cdm.column(0, i, u, cd, tmp)
+            if "rho" in cols:
+                np.multiply(out["rho"], 0.5, out=k)
+                np.multiply(k, cd, out=k)
+                np.multiply(k, area, out=k)
+            elif cdm is not None:
+                np.multiply(half_rho, cd, out=k)
+                np.multiply(k, area, out=k)
+            if "g" in cols:
+                np.multiply(mass, out["g"], out=mg)
+            return w, k, mg
+
+        return terms
+
+    def batch_terms(self, t, y, vx, vy, rho, wind, g, cd, area, mass):
+        """batch_evaluator(rho, wind, g, cd, area, mass)(t, y, vx, vy), para una sola evaluación."""
+        return self.batch_evaluator(rho, wind, g, cd, area, mass)(t, y, vx, vy)
@@ -0,0 +1,140 @@
+# events.py
+# Detección de eventos dentro de un paso de integración (impacto con el suelo,
+# apogeo, cruce de una x o y dada, umbral de velocidad...).
+# Entre los extremos de un paso el estado se reconstruye con interpolación
+# cúbica de Hermite (posición con la velocidad, velocidad con la aceleración)
+# y el instante del evento se localiza por búsqueda de raíces sobre ella.
+
+import math
+
+
+class Event:
+    """
+    Evento definido por una función g(t, x, y, vx, vy) que cambia de signo.
+    direction: -1 solo cruces de + a -, +1 solo de - a +, 0 ambos.
+    terminal=True detiene la simulación en el instante del evento.
+    """
+    def __init__(self, name, func, direction=0, terminal=False):
+        self.name = name
+        self.func = func
+        self.direction = direction
+        self.terminal = terminal
+
+    def __call__(self, t, x, y, vx, vy):
+        return self.func(t, x, y, vx, vy)
+
+    def crossed(self, g0, g1):
+        """True si g pasa de g0 a g1 en la dirección pedida."""
+        if self.direction <= 0 and g0 > 0.0 >= g1:
+            return True
+        if self.direction >= 0 and g0 < 0.0 <= g1:
+            return True
+        return False
+
+
+def apex():
+    """Apogeo: vy pasa de positiva a no positiva."""
+    return Event("apex", lambda t, x, y, vx, vy: vy, direction=-1)
+
+
+def cross_x(x0, terminal=False):
+    """Cruce de la vertical x = x0 (en cualquier sentido)."""
+    return Event(f"x={x0:g}", lambda t, x, y, vx, vy: x - x0, terminal=terminal)
+
+
+def cross_y(y0, direction=0, terminal=False):
+    """Cruce de la altura y = y0."""
+    return Event(f"y={y0:g}", lambda t, x, y, vx, vy: y - y0, direction=direction, terminal=terminal)
+
+
+def speed_below(v_min, terminal=False):
+    """La rapidez cae por debajo de v_min."""
+    return Event(f"|v|<{v_min:g}", lambda t, x, y, vx, vy: math.hypot(vx, vy) - v_min,
+                 direction=-1, terminal=terminal)
+
+
+# -----------------------------
+# Interpolación de Hermite sobre un paso
+# -----------------------------
+def hermite(p0, m0, p1, m1, h, theta):
+    """Valor en la fracción theta del paso de la cúbica con p(0)=p0, p'(0)=m0, p(1)=p1, p'(1)=m1."""
+    t2 = theta * theta
+    t3 = t2 * theta
+    return ((2.0 * t3 - 3.0 * t2 + 1.0) * p0 + (t3 - 2.0 * t2 + theta) * h * m0
+            + (3.0 * t2 - 2.0 * t3) * p1 + (t3 - t2) * h * m1)
+
+
+def hermite_slope(p0, m0, p1, m1, h, theta):
+    """Derivada respecto de theta de hermite()."""
+    t2 = theta * theta
+    return ((6.0 * t2 - 6.0 * theta) * (p0 - p1) + (3.0 * t2 - 4.0 * theta + 1.0) * h * m0
+            + (3.0 * t2 - 2.0 * theta) * h * m1)
+
+
+def hermite_state(s0, a0, s1, a1, h, theta):
+    """Estado (x, y, vx, vy) interpolado en la fracción theta del paso."""
+    x0, y0, vx0, vy0 = s0
+    x1, y1, vx1, vy1 = s1
+    return (hermite(x0, vx0, x1, vx1, h, theta),
+            hermite(y0, vy0, y1, vy1, h, theta),
+            hermite(vx0, a0[0], vx1, a1[0], h, theta),
+            hermite(vy0, a0[1], vy1, a1[1], h, theta))
+
+
+def _scalar_where(cond, a, b):
+    return a if cond else b
+
+
+GROUND_ITERATIONS = 8
+
+
+def ground_fraction(y0, vy0, y1, vy1, h, where=_scalar_where):
+    """
+    Fracción theta del paso en la que la cúbica de Hermite de y vale 0, con
+    y0 > 0 >= y1. Newton con salvaguarda de bisección y un número fijo de
+    iteraciones; solo usa aritmética y `where`, así que con where=np.where
+    funciona igual (bit a bit) sobre arrays de NumPy.
+    """
+    lo = 0.0 * y0
+    hi = lo + 1.0
+    theta = y0 / (y0 - y1)
+    for _ in range(GROUND_ITERATIONS):
+        f = hermite(y0, vy0, y1, vy1, h, theta)
+        fp = hermite_slope(y0, vy0, y1, vy1, h, theta)
+        above = f > 0.0
+        lo = where(above, theta, lo)
+        hi = where(above, hi, theta)
+        newton = theta - f / where(fp == 0.0, 1.0, fp)
+        inside = (newton >= lo) & (newton <= hi) & (fp != 0.0)
+        theta = where(inside, newton, 0.5 * (lo + hi))
+    return theta
+
+
+def locate(event, t0, s0, a0, s1, a1, h, g0, g1, tol=1e-12, max_iter=60):
+    """
+    Fracción theta del paso en la que g pasa de g0 a g1 cambiando de signo
+    (regula falsi con la modificación de Illinois) sobre el estado interpolado.
+    """
+    lo, hi = 0.0, 1.0
+    g_lo, g_hi = g0, g1
+    side = 0
+    theta = -1.0
+    for _ in range(max_iter):
+        new = (lo * g_hi - hi * g_lo) / (g_hi - g_lo)
+        if abs(new - theta) <= tol:
+            return new
+        theta = new
+        g = event(t0 + theta * h, *hermite_state(s0, a0, s1, a1, h, theta))
+        if g == 0.0:
+            break
+        if (g > 0.0) == (g_lo > 0.0):
+            lo, g_lo = theta, g
+            if side == -1:
+                g_hi *= 0.5
+            side = -1
+        else:
+            hi, g_hi = theta, g
+            if side == 1:
+                g_lo *= 0.5
+            side = 1
+    return theta
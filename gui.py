@@ -1,17 +1,30 @@
 # gui.py
 # Interfaz PySide6 que usa core.py y widgets.py
 # Ejecutar: python gui.py
-
-
+# Arranque rápido: al importar solo se cargan los widgets de Qt; NumPy, el
+# motor (core/cache) y Matplotlib se importan con la primera simulación, así
+# que la ventana aparece antes. Informe de tiempos: python -m bench.startup
+# Edición en vivo: con "En vivo" marcado, cada cambio de un campo o deslizador
+# recalcula la trayectoria en un hilo aparte (primero con un dt grueso, luego
+# con el pedido) y la dibuja completa sin pulsar Simular.
+# Comparación: Fijar guarda la trayectoria actual en la gráfica, Abanico añade
+# COMPARE_FAN ángulos calculados en lote; todas van en una LineCollection
+# (compare.CurveSet) que se añade y quita sin rehacer los ejes.
+# Perfilado: F3 muestra los tiempos de cada fase del fotograma y los contadores
+# del motor; python gui.py --profile perfil.json lo activa y lo guarda al salir.
+
+
+import bisect
 import os
 import sys
-from math import hypot
+import time
+from math import hypot, isfinite, radians, sin
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QVBoxLayout, QHBoxLayout,
-    QGridLayout, QFrame, QMessageBox, QSizePolicy
+    QGridLayout, QFrame, QMessageBox, QSizePolicy, QSlider, QCheckBox
 )
-from PySide6.QtCore import Qt, QTimer, QSize
-from PySide6.QtGui import QFont, QIcon, QPalette, QColor
+from PySide6.QtCore import Qt, QTimer, QSize, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QFont, QIcon, QPalette, QColor, QKeySequence, QShortcut
 
 BASE_DIR = os.path.dirname(
     sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__)
@@ -20,12 +33,65 @@ if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 # AHORA sí funcionan los imports locales
-from core import ProjectileSimulator
+# (cache/core y Matplotlib se importan al simular por primera vez)
 from widgets import make_button, asset_path, create_top_bar
-
-# Matplotlib canvas
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+import profiling
+
+# reproducción: fotogramas por segundo del temporizador y margen al ampliar los ejes
+FPS = 60
+AXIS_GROWTH = 1.5
+# puntos de la línea dibujada (reducción LTTB): el coste por fotograma no crece con la trayectoria
+PLOT_POINTS = 2000
+# edición en vivo: espera tras el último cambio, pasos de la pasada gruesa y
+# pasos máximos que se recalculan sin pulsar Simular
+LIVE_DEBOUNCE_MS = 15
+PREVIEW_STEPS = 256
+LIVE_MAX_STEPS = 2_000_000
+# comparación: curvas del abanico de ángulos (de 5 a 85°)
+COMPARE_FAN = 161
+
+
+class _PreviewSignals(QObject):
+    ready = Signal(int, object)     # generación, trayectoria
+
+
+class _PreviewJob(QRunnable):
+    """
+    Recalcula la trayectoria fuera del hilo de la interfaz: primero con un dt
+    grueso (unos PREVIEW_STEPS pasos, si es bastante mayor que el pedido) y
+    luego con el dt pedido, a través de la caché. Se abandona en cuanto llega
+    un cambio posterior (la generación de la ventana ya no es la suya).
+    """
+    def __init__(self, window, generation, params):
+        super().__init__()
+        self.window = window
+        self.generation = generation
+        self.params = params
+        self.signals = _PreviewSignals()
+        self.setAutoDelete(False)
+
+    def _stale(self):
+        return self.window._live_generation != self.generation
+
+    def run(self):
+        from core import ProjectileSimulator
+        from cache import cached_run
+        p = self.params
+        try:
+            flight = 2.0 * max(p["v0"] * sin(radians(p["angle_deg"])), 1.0) / max(p["g"], 1.0)
+            coarse_dt = flight / PREVIEW_STEPS
+            if coarse_dt > 4.0 * p["dt"]:
+                traj = ProjectileSimulator(**dict(p, dt=coarse_dt)).run()
+                if self._stale():
+                    return
+                self.signals.ready.emit(self.generation, traj)
+            if self._stale():
+                return
+            traj = cached_run(**p)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return
+        if not self._stale():
+            self.signals.ready.emit(self.generation, traj)
 
 
 class SimuladorWindow(QWidget):
@@ -35,10 +101,32 @@ class SimuladorWindow(QWidget):
         self.setFixedSize(1000, 640)
         self._apply_styles()
 
-        self.sim = None
+        # trayectoria precalculada y estado de la reproducción (tiempo simulado
+        # que corresponde al instante de pared self._play_start)
+        self.traj = None
+        self._frame = 0
+        self._play_start = 0.0
+        self._play_offset = 0.0
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
         self.timer.timeout.connect(self._step_sim)
 
+        # perfilado opcional (F3): None = desactivado, sin coste en el bucle
+        self.profiler = None
+        self.profile_path = None
+        self._overlay = None
+        QShortcut(QKeySequence("F3"), self, activated=self._toggle_profiling)
+
+        # edición en vivo: los cambios se agrupan (debounce) y se recalculan en
+        # un hilo; cada cambio sube la generación y deja obsoletos los trabajos anteriores
+        self._live_generation = 0
+        self._live_timer = QTimer()
+        self._live_timer.setSingleShot(True)
+        self._live_timer.timeout.connect(self._start_preview)
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(2)
+        self._preview_job = None
+
         # layout principal (vertical to include topbar)
         root = QVBoxLayout(self)
         root.setContentsMargins(6,6,6,6)
@@ -73,22 +161,26 @@ class SimuladorWindow(QWidget):
         grid.setSpacing(6)
         left_layout.addLayout(grid)
 
-        def add_row(r, label, default=""):
+        def add_row(r, label, default="", slider=None):
             lbl = QLabel(label)
             lbl.setFont(QFont("Segoe UI", 10))
             edit = QLineEdit()
             edit.setText(str(default))
             edit.setFixedHeight(28)
+            edit.textChanged.connect(self._on_param_changed)
             grid.addWidget(lbl, r, 0)
             grid.addWidget(edit, r, 1)
+            if slider:
+                grid.addWidget(self._make_slider(edit, *slider), r, 2)
             return edit
 
-        self.in_v0 = add_row(0, "Velocidad inicial (m/s):", "30")
-        self.in_angle = add_row(1, "Ángulo (°):", "45")
+        # deslizadores: (mínimo, máximo, paso)
+        self.in_v0 = add_row(0, "Velocidad inicial (m/s):", "30", (0.0, 200.0, 0.5))
+        self.in_angle = add_row(1, "Ángulo (°):", "45", (0.0, 90.0, 0.5))
         self.in_mass = add_row(2, "Masa (kg):", "1.0")
         self.in_area = add_row(3, "Área frontal (m²):", "0.01")
-        self.in_cd = add_row(4, "Coef. arrastre (Cd):", "0.47")
-        self.in_wind = add_row(5, "Viento (m/s):", "0.0")
+        self.in_cd = add_row(4, "Coef. arrastre (Cd):", "0.47", (0.0, 2.0, 0.01))
+        self.in_wind = add_row(5, "Viento (m/s):", "0.0", (-30.0, 30.0, 0.5))
         self.in_g = add_row(6, "Gravedad (m/s²):", "9.81")
         self.in_rho = add_row(7, "Densidad aire ρ (kg/m³):", "1.225")
         self.in_dt = add_row(8, "Paso dt (s):", "0.01")
@@ -100,6 +192,10 @@ class SimuladorWindow(QWidget):
         self.btn_play.setEnabled(False)
         actions_layout.addWidget(self.btn_simulate)
         actions_layout.addWidget(self.btn_play)
+        self.chk_live = QCheckBox("En vivo")
+        self.chk_live.setChecked(True)
+        self.chk_live.toggled.connect(self._on_param_changed)
+        actions_layout.addWidget(self.chk_live)
         left_layout.addLayout(actions_layout)
 
         # results (static summary)
@@ -131,16 +227,19 @@ class SimuladorWindow(QWidget):
 
         # RIGHT panel: plot
         right_frame = QFrame()
-        right_layout = QVBoxLayout(right_frame)
-        right_layout.setContentsMargins(6,6,6,6)
-
-        self.fig = Figure(figsize=(6,4), tight_layout=True)
-        self.canvas = FigureCanvas(self.fig)
-        self.ax = self.fig.add_subplot(111)
-        self.ax.set_xlabel("x (m)")
-        self.ax.set_ylabel("y (m)")
-        self.ax.grid(True, linestyle="--", alpha=0.5)
-        right_layout.addWidget(self.canvas)
+        self._right_frame = right_frame
+        self._right_layout = QVBoxLayout(right_frame)
+        self._right_layout.setContentsMargins(6,6,6,6)
+
+        # el lienzo de Matplotlib se crea al dibujar por primera vez (_ensure_canvas)
+        self.fig = None
+        self.canvas = None
+        self.ax = None
+        self._placeholder = QLabel("Pulse Simular para ver la trayectoria")
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._right_layout.addWidget(self._placeholder)
+        # fondo sin la trayectoria para el blitting; se recaptura en cada redibujado completo
+        self._background = None
 
         main_layout.addWidget(right_frame, stretch=2)
 
@@ -162,12 +261,21 @@ class SimuladorWindow(QWidget):
             if label.lower() == "play":
                 self.top_play_btn = btn
         top_layout.addStretch()
+        for label, cb in (("Fijar", self._pin_trajectory), ("Abanico", self._add_fan),
+                          ("Quitar", self._remove_comparison), ("Limpiar", self._clear_comparison)):
+            btn = make_button(label, callback=cb)
+            btn.setMinimumWidth(70)
+            top_layout.addWidget(btn)
 
         # internal data holder for plotting
-        self._plot_x = []
-        self._plot_y = []
         self._plot_line = None
         self._plot_point = None
+        self._preview_line = None
+        # curvas de comparación (compare.CurveSet, se crea con los ejes) y claves de sus grupos
+        self.curves = None
+        self._compare_keys = []
+        self._xlim = self._ylim = 1.0
+        self._run_xmax = self._run_ymax = None
 
     def _apply_styles(self):
         # estilo general: claro y minimalista, botones cuadrados
@@ -220,8 +328,8 @@ class SimuladorWindow(QWidget):
     # Top-button dynamic content (example values or real if sim exists)
     # -----------------------------
     def _show_coordinates(self):
-        if self.sim:
-            st = self.sim.get_state()
+        if self.traj is not None:
+            st = self.traj.state(self._frame)
             x, y = st["pos"]
             txt = f"<span style='color:#ef4136'><b>💢 Coordenadas:</b><br>x = {x:.2f} m (horizontal)<br>y = {y:.2f} m (vertical)</span>"
         else:
@@ -229,8 +337,8 @@ class SimuladorWindow(QWidget):
         self.dynamic_label.setText(txt)
 
     def _show_speed(self):
-        if self.sim:
-            st = self.sim.get_state()
+        if self.traj is not None:
+            st = self.traj.state(self._frame)
             vx, vy = st["vel"]
             mag = st["speed"]
             txt = (f"<span style='color:#38b6ff'><b>💠 Velocidad:</b><br>"
@@ -241,8 +349,8 @@ class SimuladorWindow(QWidget):
         self.dynamic_label.setText(txt)
 
     def _show_acc(self):
-        if self.sim:
-            st = self.sim.get_state()
+        if self.traj is not None:
+            st = self.traj.state(self._frame)
             ax, ay = st["acc"]
             txt = f"<span style='color:#9d74ee'><b>♐ Aceleración:</b><br>{ax:.2f} m/s², {ay:.2f} m/s²"
         else:
@@ -250,8 +358,8 @@ class SimuladorWindow(QWidget):
         self.dynamic_label.setText(txt)
 
     def _show_force(self):
-        if self.sim:
-            st = self.sim.get_state()
+        if self.traj is not None:
+            st = self.traj.state(self._frame)
             fx, fy = st["force"]
             txt = f"<span style='color:#ffb02c'><b>🔶 Fuerza:</b><br>{fx:.2f} N, {fy:.2f} N"
         else:
@@ -259,8 +367,8 @@ class SimuladorWindow(QWidget):
         self.dynamic_label.setText(txt)
 
     def _show_energy(self):
-        if self.sim:
-            st = self.sim.get_state()
+        if self.traj is not None:
+            st = self.traj.state(self._frame)
             kin = st["energy"]["kin"]
             pot = st["energy"]["pot"]
             tot = st["energy"]["total"]
@@ -278,85 +386,240 @@ class SimuladorWindow(QWidget):
         # call same logic as left simulate
         self._start_simulation(show_message=False)
 
+    def _read_params(self):
+        """Parámetros de los campos para ProjectileSimulator (ValueError si alguno no es un número)."""
+        return dict(v0=float(self.in_v0.text()), angle_deg=float(self.in_angle.text()),
+                    mass=float(self.in_mass.text()), area=float(self.in_area.text()),
+                    cd=float(self.in_cd.text()), wind=float(self.in_wind.text()),
+                    g=float(self.in_g.text()), rho=float(self.in_rho.text()),
+                    dt=float(self.in_dt.text()))
+
     def _start_simulation(self, show_message=True):
+        """
+        Calcula la trayectoria con los parámetros de los campos (pulsación de
+        Simular). Los parámetros inválidos siempre se avisan, como en _add_fan;
+        show_message solo decide el aviso de simulación lista. La edición en
+        vivo no pasa por aquí (_start_preview los descarta sin avisar).
+        """
         try:
-            v0 = float(self.in_v0.text())
-            angle = float(self.in_angle.text())
-            mass = float(self.in_mass.text())
-            area = float(self.in_area.text())
-            cd = float(self.in_cd.text())
-            wind = float(self.in_wind.text())
-            g = float(self.in_g.text())
-            rho = float(self.in_rho.text())
-            dt = float(self.in_dt.text())
-        except Exception as e:
-            if show_message:
-                QMessageBox.critical(self, "Error", f"Parámetros inválidos: {e}")
+            params = self._read_params()
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Parámetros inválidos: {e}")
+            return
+        if not self._runnable(params):
+            QMessageBox.critical(self, "Error", "Parámetros inválidos: dt y la masa deben ser positivos")
             return
 
-        # create simulator
-        self.sim = ProjectileSimulator(v0=v0, angle_deg=angle, mass=mass, area=area,
-                                       cd=cd, wind=wind, g=g, rho=rho, dt=dt)
-        # reset plotting buffers
-        self._plot_x = []
-        self._plot_y = []
+        # la trayectoria completa se calcula (o se recupera de la caché) de una
+        # vez; Play solo la reproduce
+        from cache import cached_run
+        self.timer.stop()
+        if self.profiler is not None:
+            # con perfilado se integra siempre (sin caché) para contar pasos y fuerzas
+            self.profiler.pause()
+            traj = profiling.profiled_run(self.profiler, **params)
+            self._update_overlay()
+        else:
+            traj = cached_run(**params)
+        self._set_trajectory(traj)
+        self._reset_plot()
+        self._enable_play()
+
+        # update status
+        self.lbl_time.setText("Tiempo: 0.00 s")
+        self.lbl_pos.setText("Pos (x,y): 0.00, 0.00")
+        self.lbl_speed.setText("Velocidad |v|: — m/s")
+        self.lbl_acc.setText("Aceleración (ax,ay): — , —")
+        self.lbl_force.setText("Fuerza (Fx,Fy): — , —")
+        self.lbl_energy.setText("Energía (K, P, T): — , — , —")
+
+        if show_message:
+            QMessageBox.information(self, "Simulación", "Simulación lista. Pulse Play para ejecutar.")
+
+    def _set_trajectory(self, traj):
+        """Carga una trayectoria para reproducirla desde el principio."""
+        import numpy as np
+        from buffers import lttb_indices
+        self.traj = traj
+        self._frame = 0
+        self._play_offset = 0.0
+        # máximos acumulados: límites de los ejes en cada muestra sin recorrer el historial
+        self._run_xmax = np.maximum.accumulate(traj.x)
+        self._run_ymax = np.maximum.accumulate(traj.y)
+        # muestras que forman la línea; en cada fotograma se usan las anteriores
+        # a la actual y se añade la actual (_plot_sel es el búfer para ello)
+        self._plot_idx = lttb_indices(traj.x, traj.y, PLOT_POINTS)
+        self._plot_sel = np.empty(len(self._plot_idx) + 1, dtype=np.int64)
+
+    def _reset_plot(self):
+        """Ejes vacíos con la línea y el punto animados y la curva de la vista previa."""
+        self._ensure_canvas()
         self.ax.clear()
+        if self.curves is None:
+            from compare import CurveSet
+            self.curves = CurveSet(self.ax)
+        else:
+            self.curves.attach(self.ax)
         self.ax.set_xlabel("x (m)")
         self.ax.set_ylabel("y (m)")
         self.ax.grid(True, linestyle="--", alpha=0.5)
-        self._plot_line, = self.ax.plot([], [], linewidth=2.0)
-        self._plot_point, = self.ax.plot([], [], marker='o', markersize=6)
+        # curva completa de la edición en vivo (forma parte del fondo)
+        self._preview_line, = self.ax.plot([], [], color="0.6", linewidth=1.2, linestyle="--")
+        # animated=True: no entran en el dibujado completo, se pintan encima del fondo
+        self._plot_line, = self.ax.plot([], [], linewidth=2.0, animated=True)
+        self._plot_point, = self.ax.plot([], [], marker='o', markersize=6, animated=True)
+        self._xlim = self._ylim = 1.0
+        self._set_limits(1.0, 1.0)
         self.canvas.draw_idle()
 
-        # enable play button
+    def _enable_play(self):
         self.btn_play.setEnabled(True)
+        self.btn_play.setText("Play")
         if hasattr(self, "top_play_btn"):
             self.top_play_btn.setEnabled(True)
             self.top_play_btn.setText("Play")
 
-        # update status
-        self.lbl_time.setText("Tiempo: 0.00 s")
-        self.lbl_pos.setText("Pos (x,y): 0.00, 0.00")
-        self.lbl_speed.setText("Velocidad |v|: — m/s")
-        self.lbl_acc.setText("Aceleración (ax,ay): — , —")
-        self.lbl_force.setText("Fuerza (Fx,Fy): — , —")
-        self.lbl_energy.setText("Energía (K, P, T): — , — , —")
+    # -----------------------------
+    # Edición en vivo
+    # -----------------------------
+    def _make_slider(self, edit, lo, hi, step):
+        """Deslizador horizontal enlazado con edit (en unidades de step)."""
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(round(lo / step), round(hi / step))
+        slider.setFixedWidth(110)
+
+        def from_edit(text):
+            try:
+                value = round(float(text) / step)
+            except ValueError:
+                return
+            slider.blockSignals(True)
+            slider.setValue(value)
+            slider.blockSignals(False)
+
+        slider.valueChanged.connect(lambda v: edit.setText(f"{v * step:g}"))
+        edit.textChanged.connect(from_edit)
+        from_edit(edit.text())
+        return slider
+
+    def _on_param_changed(self, *args):
+        # cada cambio deja obsoleto lo que se esté calculando; el temporizador
+        # de espera agrupa las ráfagas (arrastrar un deslizador)
+        self._live_generation += 1
+        if hasattr(self, "chk_live") and self.chk_live.isChecked():
+            self._live_timer.start(LIVE_DEBOUNCE_MS)
+
+    def _start_preview(self):
+        try:
+            params = self._read_params()
+        except ValueError:
+            return      # campo a medio escribir
+        if not self._runnable(params):
+            return
+        if 300.0 / params["dt"] > LIVE_MAX_STEPS:
+            return      # demasiados pasos para recalcular en cada cambio: con Simular
+        self._pool.clear()      # los trabajos en cola aún sin empezar ya no sirven
+        job = _PreviewJob(self, self._live_generation, params)
+        job.signals.ready.connect(self._on_preview)
+        self._preview_job = job
+        self._pool.start(job)
+
+    @staticmethod
+    def _runnable(params):
+        """Parámetros con los que la integración termina (dt > 0, masa > 0, todo finito)."""
+        return all(isfinite(v) for v in params.values()) and params["dt"] > 0.0 and params["mass"] > 0.0
+
+    def _on_preview(self, generation, traj):
+        """Muestra la trayectoria recalculada: curva completa y lista para Play."""
+        if generation != self._live_generation:
+            return
+        if self.timer.isActive():
+            self.timer.stop()
+            self._set_play_text("Play")
+        self._set_trajectory(traj)
+        if self._preview_line is None:
+            self._reset_plot()
+        idx = self._plot_idx
+        self._preview_line.set_data(traj.x[idx], traj.y[idx])
+        self._plot_line.set_data([], [])
+        self._plot_point.set_data([], [])
+        self._xlim = max(1.0, float(self._run_xmax[-1]) * 1.05)
+        self._ylim = max(1.0, float(self._run_ymax[-1]) * 1.05)
+        self._set_limits(self._xlim, self._ylim)
+        self.canvas.draw_idle()
+        self._enable_play()
+        self._show_readers(len(traj) - 1)
 
-        # auto-start timer (optional). We'll not start automatically; wait for Play.
-        # self.timer.start(int(self.sim.dt * 1000))
-        if show_message:
-            QMessageBox.information(self, "Simulación", "Simulación lista. Pulse Play para ejecutar.")
+    def _set_play_text(self, text):
+        self.btn_play.setText(text)
+        if hasattr(self, "top_play_btn"):
+            self.top_play_btn.setText(text)
 
     def _on_play_pause(self):
-        if not self.sim:
+        if self.traj is None:
             QMessageBox.warning(self, "Aviso", "No hay simulación cargada. Pulse Simular primero.")
             return
 
         if self.timer.isActive():
             self.timer.stop()
-            self.btn_play.setText("Play")
-            if hasattr(self, "top_play_btn"):
-                self.top_play_btn.setText("Play")
+            self._play_offset = self._play_time()
+            self._set_play_text("Play")
+            if self.profiler is not None:
+                self.profiler.pause()
         else:
-            # start timer with sim.dt interval (in ms)
-            self.timer.start(max(10, int(self.sim.dt * 1000)))
-            self.btn_play.setText("Pause")
-            if hasattr(self, "top_play_btn"):
-                self.top_play_btn.setText("Pause")
+            if self._frame >= len(self.traj) - 1:
+                self._play_offset = 0.0     # al terminar, Play vuelve a empezar
+            self._play_start = time.perf_counter()
+            self.timer.start(1000 // FPS)
+            self._set_play_text("Pause")
+
+    def _play_time(self):
+        """Tiempo simulado que toca mostrar: reproducción a tiempo real."""
+        return self._play_offset + (time.perf_counter() - self._play_start)
 
     def _step_sim(self):
-        if not self.sim or self.sim.finished:
+        """
+        Un fotograma: busca la última muestra con t <= tiempo de reproducción
+        (saltando las que no caben en el fotograma) y la dibuja con blitting.
+        """
+        traj = self.traj
+        if traj is None:
             self.timer.stop()
-            self.btn_play.setText("Play")
-            if hasattr(self, "top_play_btn"):
-                self.top_play_btn.setText("Play")
+            self._set_play_text("Play")
             return
-
-        # advance simulation
-        self.sim.step()
-        st = self.sim.get_state()
+        prof = self.profiler
+        if prof is not None:
+            prof.frame()
+
+        last = len(traj) - 1
+        self._frame = i = min(max(bisect.bisect_right(traj.t, self._play_time()) - 1, 0), last)
+        if prof is not None:
+            prof.lap("lookup")
+        self._draw_frame(i)
+        if prof is not None:
+            prof.lap("draw")
 
         # update readers
+        self._show_readers(i, prof)
+        if prof is not None:
+            prof.lap("labels")
+            if prof.frames % 15 == 0:
+                self._update_overlay()
+
+        # stop when finished
+        if i == last:
+            self.timer.stop()
+            self._set_play_text("Play")
+            if prof is not None:
+                prof.pause()
+                self._update_overlay()
+            QMessageBox.information(self, "Finalizado", "El proyectil ha tocado el suelo.")
+
+    def _show_readers(self, i, prof=None):
+        """Lecturas (tiempo, posición, velocidad...) de la muestra i."""
+        st = self.traj.state(i)
+        if prof is not None:
+            prof.lap("state")
         self.lbl_time.setText(f"Tiempo: {st['time']:.2f} s")
         x, y = st['pos']
         self.lbl_pos.setText(f"Pos (x,y): {x:.2f}, {y:.2f}")
@@ -370,31 +633,164 @@ class SimuladorWindow(QWidget):
         tot = st['energy']['total']
         self.lbl_energy.setText(f"Energía (K, P, T): {kin:.2f}, {pot:.2f}, {tot:.2f}")
 
-        # update dynamic label if user requested previously
-        # (we leave it unchanged here; top buttons update it on demand)
+    # -----------------------------
+    # Comparación de trayectorias
+    # -----------------------------
+    def _comparison(self):
+        """CurveSet de la gráfica; crea los ejes si aún no se ha dibujado nada."""
+        if self._plot_line is None:
+            self._reset_plot()
+        return self.curves
+
+    def _add_comparison(self, *args, **kwargs):
+        self._compare_keys.append(self._comparison().add(*args, **kwargs))
+        self._set_limits(self._xlim, self._ylim)
+        self.canvas.draw_idle()
 
-        # update plotting buffers
-        self._plot_x.append(x)
-        self._plot_y.append(y)
-        self._plot_line.set_data(self._plot_x, self._plot_y)
-        self._plot_point.set_data([x], [y])
+    def _pin_trajectory(self):
+        """Deja la trayectoria actual en la gráfica para compararla con las siguientes."""
+        if self.traj is not None:
+            self._add_comparison(self.traj.x, self.traj.y)
 
-        # auto-scale y min 0
-        ymin = 0.0
-        ymax = max(1.0, max(self._plot_y) * 1.05)
-        xmax = max(1.0, max(self._plot_x) * 1.05)
-        self.ax.set_xlim(0, xmax)
-        self.ax.set_ylim(ymin, ymax)
+    def _add_fan(self):
+        """Añade COMPARE_FAN ángulos de 5 a 85° con el resto de parámetros de los campos."""
+        try:
+            params = self._read_params()
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Parámetros inválidos: {e}")
+            return
+        if not self._runnable(params):
+            QMessageBox.critical(self, "Error", "Parámetros inválidos: dt y la masa deben ser positivos")
+            return
+        import numpy as np
+        from compare import batch_paths
+        params["angle_deg"] = np.linspace(5.0, 85.0, COMPARE_FAN)
+        self._add_comparison(*batch_paths(**params))
+
+    def _remove_comparison(self):
+        """Quita el último grupo añadido (una trayectoria fijada o un abanico)."""
+        if self._compare_keys:
+            self.curves.remove(self._compare_keys.pop())
+            self._set_limits(self._xlim, self._ylim)
+            self.canvas.draw_idle()
+
+    def _clear_comparison(self):
+        if self._compare_keys:
+            self.curves.clear()
+            self._compare_keys.clear()
+            self._set_limits(self._xlim, self._ylim)
+            self.canvas.draw_idle()
 
-        self.canvas.draw_idle()
+    # -----------------------------
+    # Perfilado (F3)
+    # -----------------------------
+    def set_profiling(self, enabled):
+        if not enabled:
+            self._save_profile()
+            self.profiler = None
+            if self._overlay is not None:
+                self._overlay.hide()
+            return
+        if self.profiler is None:
+            self.profiler = profiling.Profiler(frame_budget=1.0 / FPS)
+        if self._overlay is None:
+            self._overlay = QLabel(self._right_frame)
+            self._overlay.setFont(QFont("Consolas", 9))
+            self._overlay.setStyleSheet("background: rgba(0, 0, 0, 170); color: #7CFC00; padding: 4px;")
+            self._overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self._overlay.move(12, 12)
+        self._update_overlay()
+        self._overlay.show()
+        self._overlay.raise_()
+
+    def _toggle_profiling(self):
+        self.set_profiling(self.profiler is None)
+
+    def _update_overlay(self):
+        if self._overlay is not None and self.profiler is not None:
+            self._overlay.setText(self.profiler.summary())
+            self._overlay.adjustSize()
+            self._overlay.raise_()
+
+    def _save_profile(self):
+        if self.profiler is not None and self.profile_path:
+            self.profiler.dump(self.profile_path)
+
+    def closeEvent(self, event):
+        self._save_profile()
+        # los trabajos de la edición en vivo ven una generación nueva y no emiten nada
+        self._live_generation += 1
+        self._pool.clear()
+        self._pool.waitForDone()
+        super().closeEvent(event)
 
-        # stop when finished
-        if st["finished"]:
-            self.timer.stop()
-            self.btn_play.setText("Play")
-            if hasattr(self, "top_play_btn"):
-                self.top_play_btn.setText("Play")
-            QMessageBox.information(self, "Finalizado", "El proyectil ha tocado el suelo.")
+    # -----------------------------
+    # Dibujo con blitting
+    # -----------------------------
+    def _ensure_canvas(self):
+        """Crea la figura de Matplotlib la primera vez que hace falta."""
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(6,4), tight_layout=True)
+        self.canvas = FigureCanvas(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("resize_event", self._on_resize)
+        self._right_layout.replaceWidget(self._placeholder, self.canvas)
+        self._placeholder.deleteLater()
+
+    def _set_limits(self, xmax, ymax):
+        # las curvas de comparación siempre caben
+        if self.curves is not None and len(self.curves):
+            cx, cy = self.curves.extent()
+            xmax = max(xmax, cx * 1.05)
+            ymax = max(ymax, cy * 1.05)
+        self.ax.set_xlim(0, xmax)
+        self.ax.set_ylim(0.0, ymax)
+
+    def _on_resize(self, event):
+        # la reducción de las curvas de comparación depende del ancho en píxeles
+        if self.curves is not None:
+            self.curves.set_resolution()
+
+    def _on_draw(self, event):
+        # tras un dibujado completo (nuevos ejes, cambio de tamaño...) se guarda el
+        # fondo y se repinta encima la trayectoria
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        if self._plot_line is not None:
+            self.ax.draw_artist(self._plot_line)
+            self.ax.draw_artist(self._plot_point)
+
+    def _draw_frame(self, i):
+        traj = self.traj
+        k = bisect.bisect_right(self._plot_idx, i)
+        sel = self._plot_sel[:k + 1]
+        sel[:k] = self._plot_idx[:k]
+        sel[k] = i
+        self._plot_line.set_data(traj.x[sel], traj.y[sel])
+        self._plot_point.set_data(traj.x[i:i + 1], traj.y[i:i + 1])
+
+        # los ejes solo crecen, y a saltos de AXIS_GROWTH: el fondo se redibuja
+        # unas pocas veces por vuelo en lugar de en cada fotograma
+        xneed = max(1.0, float(self._run_xmax[i]) * 1.05)
+        yneed = max(1.0, float(self._run_ymax[i]) * 1.05)
+        if xneed > self._xlim or yneed > self._ylim or self._background is None:
+            final_x = max(1.0, float(self._run_xmax[-1]) * 1.05)
+            final_y = max(1.0, float(self._run_ymax[-1]) * 1.05)
+            if xneed > self._xlim:
+                self._xlim = min(final_x, xneed * AXIS_GROWTH)
+            if yneed > self._ylim:
+                self._ylim = min(final_y, yneed * AXIS_GROWTH)
+            self._set_limits(self._xlim, self._ylim)
+            self.canvas.draw()      # _on_draw guarda el fondo y pinta la trayectoria
+        else:
+            self.canvas.restore_region(self._background)
+            self.ax.draw_artist(self._plot_line)
+            self.ax.draw_artist(self._plot_point)
+        self.canvas.blit(self.ax.bbox)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -407,5 +803,12 @@ if __name__ == "__main__":
     pal.setColor(QPalette.Highlight, QColor(0,120,215))
     app.setPalette(pal)
     win = SimuladorWindow()
+    if "--profile" in sys.argv:
+        i = sys.argv.index("--profile")
+        win.profile_path = sys.argv[i + 1] if i + 1 < len(sys.argv) else "perfil.json"
+        win.set_profiling(True)
     win.show()
+    if "--startup-time" in sys.argv:
+        # medición de arranque (bench/startup.py): avisa tras el primer ciclo de eventos y sale
+        QTimer.singleShot(0, lambda: (print("startup: window shown", flush=True), app.quit()))
     sys.exit(app.exec())
@@ -0,0 +1,95 @@
+# integrators.py
+# Integradores numéricos para ProjectileSimulator
+# Cada integrador avanza el estado s = (x, y, vx, vy) un paso h a partir de la
+# aceleración a = (ax, ay) ya evaluada en el estado inicial.
+# accel(t, x, y, vx, vy) -> (ax, ay) es la única función de fuerza que se llama.
+
+import math
+
+
+def euler_step(accel, t, s, h, a):
+    """Euler explícito: posición con la velocidad del inicio del paso."""
+    x, y, vx, vy = s
+    ax, ay = a
+    return (x + vx * h, y + vy * h, vx + ax * h, vy + ay * h)
+
+
+def semi_implicit_step(accel, t, s, h, a):
+    """Euler semi-implícito (simpléctico): primero velocidad, luego posición con la velocidad nueva."""
+    x, y, vx, vy = s
+    ax, ay = a
+    vx += ax * h
+    vy += ay * h
+    return (x + vx * h, y + vy * h, vx, vy)
+
+
+def rk4_step(accel, t, s, h, a):
+    """Runge-Kutta clásico de orden 4 (4 evaluaciones de fuerza, la primera ya hecha)."""
+    x, y, vx, vy = s
+    ax1, ay1 = a
+    h2 = 0.5 * h
+
+    x2, y2, vx2, vy2 = x + h2 * vx, y + h2 * vy, vx + h2 * ax1, vy + h2 * ay1
+    ax2, ay2 = accel(t + h2, x2, y2, vx2, vy2)
+    x3, y3, vx3, vy3 = x + h2 * vx2, y + h2 * vy2, vx + h2 * ax2, vy + h2 * ay2
+    ax3, ay3 = accel(t + h2, x3, y3, vx3, vy3)
+    x4, y4, vx4, vy4 = x + h * vx3, y + h * vy3, vx + h * ax3, vy + h * ay3
+    ax4, ay4 = accel(t + h, x4, y4, vx4, vy4)
+
+    h6 = h / 6.0
+    return (x + h6 * (vx + 2.0 * vx2 + 2.0 * vx3 + vx4),
+            y + h6 * (vy + 2.0 * vy2 + 2.0 * vy3 + vy4),
+            vx + h6 * (ax1 + 2.0 * ax2 + 2.0 * ax3 + ax4),
+            vy + h6 * (ay1 + 2.0 * ay2 + 2.0 * ay3 + ay4))
+
+
+# Tablero de Butcher de Dormand-Prince 5(4)
+_DP_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# diferencia entre la solución de orden 5 y la de orden 4 (estimación del error)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def dopri5_step(accel, t, s, h, a, rtol, atol):
+    """
+    Paso de Dormand-Prince 5(4). Devuelve (s_nuevo, a_nuevo, err) donde a_nuevo
+    es la aceleración en s_nuevo (FSAL, se reutiliza en el paso siguiente) y err
+    es la norma RMS del error escalada con rtol/atol (paso aceptable si err <= 1).
+    """
+    k = [(s[2], s[3], a[0], a[1])]
+    for i in range(1, 7):
+        row = _DP_A[i]
+        st = tuple(s[j] + h * sum(c * kk[j] for c, kk in zip(row, k)) for j in range(4))
+        ax, ay = accel(t + _DP_C[i] * h, *st)
+        k.append((st[2], st[3], ax, ay))
+    # la última etapa se evalúa justo en el estado de orden 5
+    s_new = st
+    acc = 0.0
+    for j in range(4):
+        e = h * sum(c * kk[j] for c, kk in zip(_DP_E, k))
+        sc = atol + rtol * max(abs(s[j]), abs(s_new[j]))
+        acc += (e / sc) ** 2
+    return s_new, (ax, ay), math.sqrt(acc / 4.0)
+
+
+# integradores de paso fijo: f(accel, t, s, h, a) -> s_nuevo
+FIXED_STEP = {
+    "euler": euler_step,
+    "semi_implicit": semi_implicit_step,
+    "rk4": rk4_step,
+}
+
+# integradores adaptativos: f(accel, t, s, h, a, rtol, atol) -> (s_nuevo, a_nuevo, err)
+ADAPTIVE = {
+    "rk45": dopri5_step,
+}
+
+INTEGRATORS = tuple(FIXED_STEP) + tuple(ADAPTIVE)
@@ -0,0 +1,181 @@
+# kernels.py
+# Núcleos compilados (Numba) del bucle de integración por defecto: arrastre
+# cuadrático + gravedad + viento con Euler semi-implícito.
+# Si numba no está instalado, HAVE_NUMBA es False y el simulador usa el código
+# Python de core.py. Las operaciones son las mismas y en el mismo orden que en
+# ProjectileSimulator._accel, así que ambos caminos dan resultados idénticos.
+# Se compilan con nogil: mientras integran, otros hilos (p. ej. el bucle de
+# eventos de server.py) siguen corriendo.
+# También el bucle por muestra de los cuantiles P² de montecarlo.py (sin numba
+# corre como Python normal, más lento).
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:   # numba es opcional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Sustituto sin compilar: devuelve la función tal cual."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def accel(vx, vy, wind, rho, cd, area, mass, g):
+    """Aceleración (ax, ay); mismas operaciones que ProjectileSimulator._accel."""
+    vrel_x = vx - wind
+    vrel = math.sqrt(vrel_x * vrel_x + vy * vy)
+    if vrel == 0.0:
+        return 0.0, -mass * g / mass
+    Fd = 0.5 * rho * cd * area * vrel * vrel
+    return -Fd * (vrel_x / vrel) / mass, (-Fd * (vy / vrel) - mass * g) / mass
+
+
+@njit(cache=True, nogil=True)
+def semi_implicit_run(state, wind, rho, cd, area, mass, g, dt, max_time, buf, n):
+    """
+    Integra desde state = [x, y, vx, vy, t] (se actualiza en el sitio) escribiendo
+    una muestra por paso en las columnas de buf (t, x, y, vx, vy, ax, ay, kin, pot)
+    a partir de la columna n. Se detiene, sin darlo, antes del paso que termina
+    la simulación (suelo o max_time), que queda para el código Python porque
+    localiza el impacto, o cuando buf se llena. Devuelve el nuevo n.
+    """
+    x, y, vx, vy, t = state[0], state[1], state[2], state[3], state[4]
+    cap = buf.shape[1]
+    while n < cap:
+        ax, ay = accel(vx, vy, wind, rho, cd, area, mass, g)
+        vx1 = vx + ax * dt
+        vy1 = vy + ay * dt
+        x1 = x + vx1 * dt
+        y1 = y + vy1 * dt
+        t1 = t + dt
+        if (y1 <= 0.0 and t1 > 0.0) or t1 >= max_time:
+            break
+        buf[0, n] = t
+        buf[1, n] = x
+        buf[2, n] = y
+        buf[3, n] = vx
+        buf[4, n] = vy
+        buf[5, n] = ax
+        buf[6, n] = ay
+        buf[7, n] = 0.5 * mass * (vx * vx + vy * vy)
+        buf[8, n] = mass * g * max(0.0, y)
+        n += 1
+        x, y, vx, vy, t = x1, y1, vx1, vy1, t1
+    state[0], state[1], state[2], state[3], state[4] = x, y, vx, vy, t
+    return n
+
+
+# proyectiles que batch_run integra a la vez: sus copias de trabajo caben en
+# la caché L1/L2
+BATCH_BLOCK = 256
+
+
+@njit(cache=True, nogil=True)
+def batch_run(x, y, vx, vy, t, y_max, wind, rho, cd, area, mass, g, dt, max_time, last):
+    """
+    Integra cada proyectil del lote hasta el suelo o max_time (arrays en el
+    sitio, y_max con la altura máxima). Para los que tocan el suelo guarda en last[i] = (x, y, vx, vy, ax, ay, t)
+    del inicio del último paso, para localizar el impacto después con
+    events.ground_fraction. Devuelve un array bool con los que aterrizaron.
+    """
+    n = x.shape[0]
+    landed = np.zeros(n, dtype=np.bool_)
+    for lo in range(0, n, BATCH_BLOCK):
+        _run_block(x, y, vx, vy, t, y_max, wind, rho, cd, area, mass, g, dt, max_time, last,
+                   landed, lo, min(lo + BATCH_BLOCK, n))
+    return landed
+
+
+@njit(cache=True, nogil=True)
+def _run_block(x, y, vx, vy, t, y_max, wind, rho, cd, area, mass, g, dt, max_time, last, landed, lo, hi):
+    """
+    batch_run de las filas lo:hi. Todas avanzan a la vez, un paso por vuelta,
+    sobre copias contiguas: los pasos de proyectiles distintos son
+    independientes y el procesador los solapa (uno a uno, cada paso espera a
+    la raíz y las divisiones del anterior). La que termina se sustituye por la
+    última de las copias.
+    """
+    rows = np.arange(lo, hi)
+    X, Y, VX, VY, T, YM = x[lo:hi].copy(), y[lo:hi].copy(), vx[lo:hi].copy(), vy[lo:hi].copy(), \
+        t[lo:hi].copy(), y_max[lo:hi].copy()
+    W, R, CD, A, M, G = wind[lo:hi].copy(), rho[lo:hi].copy(), cd[lo:hi].copy(), area[lo:hi].copy(), \
+        mass[lo:hi].copy(), g[lo:hi].copy()
+    H, TM = dt[lo:hi].copy(), max_time[lo:hi].copy()
+    m = hi - lo
+    while m > 0:
+        j = 0
+        while j < m:
+            xi, yi, vxi, vyi, ti = X[j], Y[j], VX[j], VY[j], T[j]
+            ax, ay = accel(vxi, vyi, W[j], R[j], CD[j], A[j], M[j], G[j])
+            h = H[j]
+            vx1 = vxi + ax * h
+            vy1 = vyi + ay * h
+            x1 = xi + vx1 * h
+            y1 = yi + vy1 * h
+            t1 = ti + h
+            if y1 > YM[j]:
+                YM[j] = y1
+            hit = y1 <= 0.0 and t1 > 0.0
+            if not hit and t1 < TM[j]:
+                X[j], Y[j], VX[j], VY[j], T[j] = x1, y1, vx1, vy1, t1
+                j += 1
+                continue
+            i = rows[j]
+            if hit:
+                last[i, 0], last[i, 1], last[i, 2], last[i, 3] = xi, yi, vxi, vyi
+                last[i, 4], last[i, 5], last[i, 6] = ax, ay, ti
+                landed[i] = True
+            x[i], y[i], vx[i], vy[i], t[i], y_max[i] = x1, y1, vx1, vy1, t1, YM[j]
+            # la última ocupa su hueco y se integra en esta misma vuelta
+            m -= 1
+            rows[j] = rows[m]
+            X[j], Y[j], VX[j], VY[j], T[j], YM[j] = X[m], Y[m], VX[m], VY[m], T[m], YM[m]
+            W[j], R[j], CD[j], A[j], M[j], G[j], H[j], TM[j] = W[m], R[m], CD[m], A[m], M[m], G[m], H[m], TM[m]
+
+
+@njit(cache=True, nogil=True)
+def p2_update(q, pos, desired, incr, xs):
+    """
+    Algoritmo P² (Jain y Chlamtac) para un cuantil: actualiza en el sitio las
+    alturas q[5], posiciones pos[5] y posiciones deseadas desired[5] de los
+    marcadores con cada valor de xs (incr son los incrementos de desired).
+    """
+    for x in xs:
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x < q[1]:
+            k = 0
+        elif x < q[2]:
+            k = 1
+        elif x < q[3]:
+            k = 2
+        elif x <= q[4]:
+            k = 3
+        else:
+            q[4] = x
+            k = 3
+        for i in range(k + 1, 5):
+            pos[i] += 1.0
+        for i in range(5):
+            desired[i] += incr[i]
+        for i in range(1, 4):
+            d = desired[i] - pos[i]
+            if (d >= 1.0 and pos[i + 1] - pos[i] > 1.0) or (d <= -1.0 and pos[i - 1] - pos[i] < -1.0):
+                s = 1.0 if d > 0.0 else -1.0
+                # interpolación parabólica; si se sale del intervalo, lineal
+                qp = q[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if q[i - 1] < qp < q[i + 1]:
+                    q[i] = qp
+                else:
+                    j = i + int(s)
+                    q[i] = q[i] + s * (q[j] - q[i]) / (pos[j] - pos[i])
+                pos[i] += s
@@ -0,0 +1,258 @@
+# montecarlo.py
+# Propagación de incertidumbre por Monte Carlo: muestrea v0, ángulo, Cd,
+# viento, rho... de sus distribuciones con una semilla reproducible, integra
+# por trozos con BatchProjectileSimulator (en uno o varios procesos) y
+# actualiza las estadísticas en una sola pasada según llegan los resultados:
+# media y varianza (Welford), cuantiles (P²) e histograma 2D del impacto.
+# La memoria no depende del número de muestras; puede parar en cuanto los
+# intervalos de confianza de las medias convergen.
+# Uso:
+#     res = propagate(v0=Normal(30, 0.5), angle_deg=Normal(45, 1), cd=Uniform(0.42, 0.52),
+#                     wind=Normal(0, 2), n_max=1_000_000, seed=1, rel_tol=1e-4)
+#     print(res.summary())
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+import kernels
+from sweep import SUMMARY, _check_names, run_chunks
+
+METRICS = ("range", "apex", "flight_time", "impact_speed")
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+# -----------------------------
+# Distribuciones: f(rng, n) -> array de n muestras
+# -----------------------------
+class Normal:
+    def __init__(self, mean, std):
+        self.mean = float(mean)
+        self.std = float(std)
+
+    def __call__(self, rng, n):
+        return rng.normal(self.mean, self.std, n)
+
+
+class Uniform:
+    def __init__(self, low, high):
+        self.low = float(low)
+        self.high = float(high)
+
+    def __call__(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+
+def _sampler(dist):
+    """Escalar -> fijo, tupla (min, max) -> uniforme, o función rng, n -> array."""
+    if callable(dist):
+        return dist
+    if isinstance(dist, tuple):
+        return Uniform(*dist)
+    value = float(dist)
+    return lambda rng, n: value
+
+
+def sample_chunks(distributions, n_max, chunk_size, seed=None):
+    """
+    Genera (start, columnas) con n_max muestras en trozos de chunk_size. Cada
+    trozo tiene su propio generador derivado de la semilla, así que las
+    muestras no dependen del número de procesos ni del tamaño de los lotes en vuelo.
+    """
+    samplers = {name: _sampler(dist) for name, dist in distributions.items()}
+    seq = np.random.SeedSequence(seed)
+    for start in range(0, n_max, chunk_size):
+        n = min(chunk_size, n_max - start)
+        rng = np.random.default_rng(seq.spawn(1)[0])
+        yield start, {name: np.broadcast_to(sample(rng, n), n).astype(float)
+                      for name, sample in samplers.items()}
+
+
+# -----------------------------
+# Estadísticas en una pasada
+# -----------------------------
+class Welford:
+    """Media, varianza, mínimo y máximo acumulados (Welford / Chan por lotes)."""
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        nb = values.size
+        if nb == 0:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + nb
+        delta = mean_b - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2_b + delta * delta * self.n * nb / n
+        self.n = n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def half_width(self, z):
+        """Semiancho del intervalo de confianza de la media (aproximación normal)."""
+        return z * self.std / math.sqrt(self.n) if self.n > 1 else math.inf
+
+
+class P2Quantile:
+    """Cuantil p estimado con el algoritmo P² (5 marcadores, memoria constante)."""
+    def __init__(self, p):
+        self.p = float(p)
+        self._first = []
+        self.q = self.pos = self.desired = None
+        self.incr = np.array([0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0])
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if self.q is None:
+            take = 5 - len(self._first)
+            self._first.extend(values[:take].tolist())
+            values = values[take:]
+            if len(self._first) < 5:
+                return
+            p = self.p
+            self.q = np.array(sorted(self._first))
+            self.pos = np.arange(5.0)
+            self.desired = np.array([0.0, 2.0 * p, 4.0 * p, 2.0 + 2.0 * p, 4.0])
+        if values.size:
+            kernels.p2_update(self.q, self.pos, self.desired, self.incr, values)
+
+    @property
+    def value(self):
+        if self.q is not None:
+            return float(self.q[2])
+        if not self._first:
+            return math.nan
+        return float(np.quantile(self._first, self.p))
+
+
+class Histogram2D:
+    """
+    Histograma 2D de tamaño fijo. Si no se dan los límites se fijan con el
+    primer lote (media ± 5 desviaciones); lo que cae fuera se cuenta en outside.
+    """
+    def __init__(self, bins=64, range=None):
+        self.bins = bins
+        self.range = range
+        self.counts = None
+        self.xedges = self.yedges = None
+        self.total = 0
+        self.outside = 0
+
+    def update(self, x, y):
+        if x.size == 0:
+            return
+        self.total += x.size
+        if self.counts is None:
+            if self.range is None:
+                self.range = [self._span(x), self._span(y)]
+            self.counts, self.xedges, self.yedges = np.histogram2d(x, y, self.bins, self.range)
+            self.counts = self.counts.astype(np.int64)
+        else:
+            self.counts += np.histogram2d(x, y, (self.xedges, self.yedges))[0].astype(np.int64)
+        self.outside = self.total - int(self.counts.sum())
+
+    @staticmethod
+    def _span(v):
+        mean, std = float(v.mean()), float(v.std())
+        std = std or max(abs(mean) * 1e-6, 1e-9)
+        return (mean - 5.0 * std, mean + 5.0 * std)
+
+
+class MonteCarloResult:
+    """Resultado de propagate(): estadísticas por métrica e histograma del impacto."""
+    def __init__(self, n, landed, converged, confidence, welford, quantiles, hist):
+        self.n = n
+        self.landed = landed
+        self.converged = converged
+        self.confidence = confidence
+        self.stats = {}
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        for name, w in welford.items():
+            half = w.half_width(z)
+            self.stats[name] = {
+                "mean": w.mean,
+                "std": w.std,
+                "ci": (w.mean - half, w.mean + half),
+                "min": w.min,
+                "max": w.max,
+                "quantiles": {q.p: q.value for q in quantiles[name]},
+            }
+        self.hist = hist
+
+    def summary(self):
+        lines = [f"{self.n} muestras ({self.landed} aterrizan), "
+                 f"{'convergido' if self.converged else 'sin convergencia'}; IC {self.confidence:.0%}"]
+        for name, st in self.stats.items():
+            qs = "  ".join(f"p{p * 100:g}={v:.4g}" for p, v in st["quantiles"].items())
+            lines.append(f"{name:13s} media {st['mean']:.6g} ± {(st['ci'][1] - st['ci'][0]) / 2:.2g}  "
+                         f"desv {st['std']:.4g}  {qs}")
+        return "\n".join(lines)
+
+
+def propagate(n_max=100_000, seed=None, chunk_size=10_000, metrics=METRICS, quantiles=QUANTILES,
+              hist=("range", "flight_time"), bins=64, hist_range=None, confidence=0.95,
+              rel_tol=None, abs_tol=0.0, min_samples=10_000, max_workers=1, backend="auto",
+              progress=None, cancel=None, **distributions):
+    """
+    Monte Carlo de hasta n_max lanzamientos. Cada parámetro de sweep.PARAMS (y
+    max_time, y0) es un escalar fijo, una tupla (min, max) uniforme, Normal(...),
+    Uniform(...) o una función rng, n -> array; los demás toman su valor por defecto.
+
+    Las estadísticas (solo de los proyectiles que aterrizan) se actualizan por
+    trozos en el orden de las muestras, así que el resultado es el mismo con
+    cualquier max_workers. Con rel_tol (o abs_tol > 0) para tras un trozo en el
+    que, con al menos min_samples muestras, el semiancho del intervalo de
+    confianza de la media de cada métrica es <= max(abs_tol, rel_tol * |media|).
+    progress(hechas, n_max) se llama tras cada trozo; cancel (threading.Event) detiene.
+    """
+    _check_names(distributions)
+    unknown = set(metrics) - set(SUMMARY)
+    if unknown:
+        raise ValueError(f"métricas desconocidas: {', '.join(sorted(unknown))}")
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    welford = {name: Welford() for name in metrics}
+    quants = {name: [P2Quantile(p) for p in quantiles] for name in metrics}
+    histogram = Histogram2D(bins, hist_range) if hist else None
+    stop_early = rel_tol is not None or abs_tol > 0.0
+
+    n = landed = 0
+    converged = False
+    results = run_chunks(sample_chunks(distributions, n_max, chunk_size, seed), max_workers,
+                         cancel, backend, ordered=True)
+    try:
+        for _, _, summary in results:
+            mask = summary["landed"]
+            n += mask.size
+            landed += int(mask.sum())
+            for name in metrics:
+                values = summary[name][mask]
+                welford[name].update(values)
+                for q in quants[name]:
+                    q.update(values)
+            if histogram is not None:
+                histogram.update(summary[hist[0]][mask], summary[hist[1]][mask])
+            if progress:
+                progress(n, n_max)
+            if stop_early and n >= min_samples and all(
+                    w.half_width(z) <= max(abs_tol, (rel_tol or 0.0) * abs(w.mean)) for w in welford.values()):
+                converged = True
+                break
+    finally:
+        results.close()
+    return MonteCarloResult(n, landed, converged, confidence, welford, quants, histogram)
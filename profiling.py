@@ -0,0 +1,177 @@
+# profiling.py
+# Instrumentación opcional del motor y del bucle de la interfaz:
+#   - instrument(sim, profiler): cuenta pasos y evaluaciones de fuerza de un
+#     ProjectileSimulator o BatchProjectileSimulator envolviendo sus métodos en
+#     esa instancia; los simuladores sin instrumentar no pagan nada;
+#   - Profiler: contadores, tiempos por fase, histograma de tiempos de
+#     fotograma y fotogramas perdidos, exportables a JSON.
+# En gui.py, F3 activa el perfilado y muestra un resumen sobre la gráfica
+# (python gui.py --profile perfil.json lo activa al arrancar y lo guarda al salir).
+# Uso:
+#     prof = Profiler()
+#     tray = instrument(ProjectileSimulator(v0=30, angle_deg=45), prof).run()
+#     prof.counters       # {"runs": 1, "steps": ..., "force_evals": ...}
+#     prof.dump("perfil.json")
+
+import json
+import time
+
+
+class Profiler:
+    """
+    Contadores, fases (veces, tiempo total y máximo) e histograma de tiempos
+    de fotograma en cubos de bin_ms (el último recoge lo que se pasa). Un
+    fotograma que llega tarde cuenta como perdidos los intervalos de
+    frame_budget que ocupó de más.
+    """
+    def __init__(self, frame_budget=1.0 / 60.0, bin_ms=2.0, bins=25):
+        self.frame_budget = float(frame_budget)
+        self.bin_ms = float(bin_ms)
+        self.counters = {}
+        self.phases = {}            # nombre -> [veces, total (s), máximo (s)]
+        self.frame_hist = [0] * (bins + 1)
+        self.frames = 0
+        self.dropped = 0
+        self._last_frame = None
+        self._mark = 0.0
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add(self, name, seconds):
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [1, seconds, seconds]
+        else:
+            phase[0] += 1
+            phase[1] += seconds
+            if seconds > phase[2]:
+                phase[2] = seconds
+
+    # -- fotogramas: frame() al empezar cada tic, lap(fase) al acabar cada fase --
+    def frame(self):
+        """Empieza un fotograma: registra el intervalo desde el anterior."""
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            interval = now - self._last_frame
+            self.frames += 1
+            b = min(int(interval * 1e3 / self.bin_ms), len(self.frame_hist) - 1)
+            self.frame_hist[b] += 1
+            late = int(interval / self.frame_budget + 0.5) - 1
+            if late > 0:
+                self.dropped += late
+        self._last_frame = self._mark = now
+
+    def lap(self, name):
+        """Cierra la fase name (tiempo desde frame() o desde la fase anterior)."""
+        now = time.perf_counter()
+        self.add(name, now - self._mark)
+        self._mark = now
+
+    def pause(self):
+        """La reproducción se detiene: el hueco hasta el siguiente fotograma no cuenta."""
+        self._last_frame = None
+
+    def frame_percentile(self, q):
+        """Cuantil q (0-1) aproximado del tiempo de fotograma (ms), con el borde superior del cubo."""
+        if not self.frames:
+            return 0.0
+        target = q * self.frames
+        seen = 0
+        for b, n in enumerate(self.frame_hist):
+            seen += n
+            if seen >= target:
+                return (b + 1) * self.bin_ms
+        return len(self.frame_hist) * self.bin_ms
+
+    def to_dict(self):
+        return {
+            "counters": dict(self.counters),
+            "phases": {name: {"count": n, "total_ms": total * 1e3, "mean_ms": total * 1e3 / n,
+                              "max_ms": worst * 1e3}
+                       for name, (n, total, worst) in self.phases.items()},
+            "frames": {
+                "count": self.frames,
+                "dropped": self.dropped,
+                "budget_ms": self.frame_budget * 1e3,
+                "bin_ms": self.bin_ms,
+                "histogram": list(self.frame_hist),
+                "p50_ms": self.frame_percentile(0.5),
+                "p95_ms": self.frame_percentile(0.95),
+            },
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """Resumen en unas líneas de texto (la capa de gui.py)."""
+        lines = [f"fotogramas {self.frames}  perdidos {self.dropped}  "
+                 f"p50 {self.frame_percentile(0.5):.0f} ms  p95 {self.frame_percentile(0.95):.0f} ms"]
+        for name, (n, total, worst) in self.phases.items():
+            lines.append(f"{name:10s} {total * 1e3 / n:7.3f} ms  máx {worst * 1e3:6.2f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"{name:10s} {value}")
+        return "\n".join(lines)
+
+    def reset(self):
+        self.__init__(self.frame_budget, self.bin_ms, len(self.frame_hist) - 1)
+
+
+def instrument(sim, profiler):
+    """
+    Cuenta en profiler las ejecuciones ("runs"), los pasos ("steps") y las
+    evaluaciones de fuerza ("force_evals") de sim; en un lote, "force_evals"
+    cuenta proyectiles y "projectile_steps" los pasos de cada proyectil. Los
+    núcleos compilados no pasan por esos métodos, así que sim queda con
+    backend="python". Devuelve sim.
+    """
+    counters = profiler.counters
+    for name in ("runs", "steps", "force_evals"):
+        counters.setdefault(name, 0)
+    sim.backend = "python"
+    accel, run = sim._accel, sim.run
+
+    def counted_run():
+        counters["runs"] += 1
+        return run()
+
+    if hasattr(sim, "_advance"):
+        advance = sim._advance
+
+        def counted_accel(t, x, y, vx, vy):
+            counters["force_evals"] += 1
+            return accel(t, x, y, vx, vy)
+
+        def counted_advance(ax, ay):
+            counters["steps"] += 1
+            return advance(ax, ay)
+
+        sim._advance = counted_advance
+    else:
+        counters.setdefault("projectile_steps", 0)
+        step = sim.step
+
+        def counted_accel(vx, vy, *args):
+            counters["force_evals"] += vx.size
+            return accel(vx, vy, *args)
+
+        def counted_step():
+            counters["steps"] += 1
+            counters["projectile_steps"] += sim.n_active
+            return step()
+
+        sim.step = counted_step
+    sim._accel = counted_accel
+    sim.run = counted_run
+    return sim
+
+
+def profiled_run(profiler, **params):
+    """ProjectileSimulator(**params).run() instrumentado, sin caché, con su tiempo en la fase "simulate"."""
+    from core import ProjectileSimulator
+    start = time.perf_counter()
+    traj = instrument(ProjectileSimulator(**params), profiler).run()
+    profiler.add("simulate", time.perf_counter() - start)
+    return traj
@@ -0,0 +1,180 @@
+# sensitivity.py
+# Sensibilidades por derivación hacia delante (ecuaciones variacionales):
+# junto al estado (x, y, vx, vy) se integra su matriz tangente respecto de
+# los parámetros (v0, ángulo, masa, área, Cd, viento, g, rho, y0) con el mismo
+# esquema discreto, así que las derivadas son las exactas de lo que calcula
+# el simulador, sin diferencias finitas ni simulaciones extra. En el impacto y
+# en el apogeo se deriva también el instante del evento (teorema de la
+# función implícita sobre la interpolación de Hermite).
+# Uso:
+#     sim = TangentSimulator(v0=40, angle_deg=30, cd=0.47)
+#     tray = sim.run()
+#     sim.jacobians["ground"]["x", "angle_deg"]      # d(alcance)/d(ángulo), m/grado
+#     sim.jacobians["apex"].gradient("y")            # {"v0": ..., "cd": ..., ...}
+
+import math
+
+import numpy as np
+
+from core import ProjectileSimulator
+from events import apex, hermite_slope
+
+PARAMS = ("v0", "angle_deg", "mass", "area", "cd", "wind", "g", "rho", "y0")
+INTEGRATORS = ("euler", "semi_implicit", "rk4")
+_V0, _ANGLE, _MASS, _AREA, _CD, _WIND, _G, _RHO, _Y0 = range(len(PARAMS))
+
+
+class EventJacobian:
+    """
+    Derivadas de (t, x, y, vx, vy) en un evento respecto de PARAMS:
+    matrix[fila, columna], jac["x", "cd"] o jac.gradient("x").
+    """
+    ROWS = ("t", "x", "y", "vx", "vy")
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def __getitem__(self, key):
+        row, param = key
+        return float(self.matrix[self.ROWS.index(row), PARAMS.index(param)])
+
+    def gradient(self, row):
+        return dict(zip(PARAMS, self.matrix[self.ROWS.index(row)].tolist()))
+
+
+class TangentSimulator(ProjectileSimulator):
+    """
+    ProjectileSimulator que integra además la matriz tangente S = d(x, y, vx, vy)/d(PARAMS)
+    (4 x len(PARAMS)). Tras el impacto y el apogeo, jacobians["ground"] y
+    jacobians["apex"] son EventJacobian del instante y del estado en el evento.
+    Admite los integradores de paso fijo (euler, semi_implicit, rk4) y el
+    arrastre cuadrático con parámetros constantes (sin env ni eventos de usuario).
+    """
+    def __init__(self, v0=30.0, angle_deg=45.0, mass=1.0, area=0.01, cd=0.47,
+                 wind=0.0, g=9.81, rho=1.225, dt=0.01, max_time=300.0, y0=0.0,
+                 integrator="semi_implicit"):
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"integrador no admitido para sensibilidades: {integrator!r} "
+                             f"(opciones: {', '.join(INTEGRATORS)})")
+        super().__init__(v0=v0, angle_deg=angle_deg, mass=mass, area=area, cd=cd, wind=wind, g=g,
+                         rho=rho, dt=dt, max_time=max_time, y0=y0, integrator=integrator,
+                         events=[apex()], backend="python")
+        # d(estado inicial)/d(parámetros): x = 0, y = y0, v = v0 (cos, sin)
+        self.S = np.zeros((4, len(PARAMS)))
+        c, s = math.cos(self.angle), math.sin(self.angle)
+        deg = math.pi / 180.0
+        self.S[1, _Y0] = 1.0
+        self.S[2, _V0], self.S[2, _ANGLE] = c, -self.v0 * s * deg
+        self.S[3, _V0], self.S[3, _ANGLE] = s, self.v0 * c * deg
+        self.jacobians = {}
+        self._tangent = None            # (S0, A0, S1) del paso en curso
+
+    def _partials(self, vx, vy):
+        """(J, P): d(ax, ay)/d(vx, vy) (2 x 2) y d(ax, ay)/d(PARAMS) (2 x len(PARAMS))."""
+        P = np.zeros((2, len(PARAMS)))
+        P[1, _G] = -1.0
+        m = self.mass
+        vrel_x = vx - self.wind
+        vrel = math.sqrt(vrel_x * vrel_x + vy * vy)
+        if vrel == 0:
+            # el arrastre es cuadrático: su derivada también se anula
+            return np.zeros((2, 2)), P
+        k = 0.5 * self.rho * self.cd * self.area
+        q = k / m
+        jxy = -q * vrel_x * vy / vrel
+        J = np.array([[-q * (vrel + vrel_x * vrel_x / vrel), jxy],
+                      [jxy, -q * (vrel + vy * vy / vrel)]])
+        # arrastre por unidad de k = 0.5 * rho * Cd * A
+        d = np.array([-vrel * vrel_x / m, -vrel * vy / m])
+        P[:, _CD] = 0.5 * self.rho * self.area * d
+        P[:, _AREA] = 0.5 * self.rho * self.cd * d
+        P[:, _RHO] = 0.5 * self.cd * self.area * d
+        P[:, _MASS] = -k * d / m
+        P[:, _WIND] = -J[:, 0]
+        return J, P
+
+    def _accel_tangent(self, vx, vy, V):
+        """d(ax, ay)/d(PARAMS) dada la tangente V de la velocidad (2 x len(PARAMS))."""
+        J, P = self._partials(vx, vy)
+        return J @ V + P
+
+    def _step_tangent(self, S, ax, ay, A):
+        """Tangente tras un paso del integrador (mismo esquema aplicado a S)."""
+        h = self.dt
+        X, V = S[:2], S[2:]
+        if self.integrator == "semi_implicit":
+            V1 = V + h * A
+            return np.vstack((X + h * V1, V1))
+        if self.integrator == "euler":
+            return np.vstack((X + h * V, V + h * A))
+        # rk4: la aceleración solo depende de la velocidad, así que basta con
+        # repetir las etapas de rk4_step sobre (vx, vy) y su tangente
+        vx, vy, t, h2 = self.vx, self.vy, self.t, 0.5 * h
+        vx2, vy2 = vx + h2 * ax, vy + h2 * ay
+        V2 = V + h2 * A
+        ax2, ay2 = self._accel(t + h2, 0.0, 0.0, vx2, vy2)
+        A2 = self._accel_tangent(vx2, vy2, V2)
+        vx3, vy3 = vx + h2 * ax2, vy + h2 * ay2
+        V3 = V + h2 * A2
+        ax3, ay3 = self._accel(t + h2, 0.0, 0.0, vx3, vy3)
+        A3 = self._accel_tangent(vx3, vy3, V3)
+        vx4, vy4 = vx + h * ax3, vy + h * ay3
+        V4 = V + h * A3
+        A4 = self._accel_tangent(vx4, vy4, V4)
+        h6 = h / 6.0
+        return np.vstack((X + h6 * (V + 2.0 * V2 + 2.0 * V3 + V4),
+                          V + h6 * (A + 2.0 * A2 + 2.0 * A3 + A4)))
+
+    def _advance(self, ax, ay):
+        S0 = self.S
+        A0 = self._accel_tangent(self.vx, self.vy, S0[2:])
+        S1 = self._step_tangent(S0, ax, ay, A0)
+        self._tangent = (S0, A0, S1)
+        self.S = S1
+        return super()._advance(ax, ay)
+
+    def _handle_events(self, t0, s0, a0, s1, a1, h):
+        n = len(self.event_log)
+        a1 = super()._handle_events(t0, s0, a0, s1, a1, h)
+        for record in self.event_log[n:]:
+            theta = (record["time"] - t0) / h
+            jac = self._event_jacobian(record["name"], theta, h, s0, a0, s1, a1)
+            self.jacobians[record["name"]] = EventJacobian(jac)
+            if record["name"] == "ground":
+                # el estado queda en el impacto: la tangente también
+                self.S = jac[1:].copy()
+        return a1
+
+    def _event_jacobian(self, name, theta, h, s0, a0, s1, a1):
+        """
+        Derivadas de (t, x, y, vx, vy) en el evento localizado en la fracción
+        theta del paso: la del estado interpolado a theta fijo más la de theta,
+        que sale de derivar la condición del evento (y = 0 o vy = 0).
+        """
+        S0, A0, S1 = self._tangent
+        root = 1 if name == "ground" else 3
+        if name == "ground" and s0[1] <= 0.0:
+            # ya partía del suelo: el evento es el estado inicial del paso
+            return np.vstack((np.zeros(len(PARAMS)), S0))
+        A1 = self._accel_tangent(s1[2], s1[3], S1[2:])
+        # Hermite: posición con la velocidad, velocidad con la aceleración
+        M0 = np.vstack((S0[2:], A0))
+        M1 = np.vstack((S1[2:], A1))
+        t2 = theta * theta
+        t3 = t2 * theta
+        Z = ((2.0 * t3 - 3.0 * t2 + 1.0) * S0 + (t3 - 2.0 * t2 + theta) * h * M0
+             + (3.0 * t2 - 2.0 * t3) * S1 + (t3 - t2) * h * M1)
+        m0 = (s0[2], s0[3]) + tuple(a0)
+        m1 = (s1[2], s1[3]) + tuple(a1)
+        slope = np.array([hermite_slope(s0[i], m0[i], s1[i], m1[i], h, theta) for i in range(4)])
+        dtheta = -Z[root] / slope[root]
+        Z += np.outer(slope, dtheta)
+        Z[root] = 0.0           # la condición del evento se cumple para cualquier parámetro
+        return np.vstack((h * dtheta, Z))
+
+
+def sensitivities(**params):
+    """(Trajectory, jacobians) de una simulación con TangentSimulator(**params)."""
+    sim = TangentSimulator(**params)
+    traj = sim.run()
+    return traj, sim.jacobians
@@ -0,0 +1,383 @@
+# server.py
+# Servicio local de simulación para muchos clientes a la vez (asyncio, sin
+# dependencias): las peticiones que llegan dentro de una ventana corta se
+# agrupan en un solo lote de BatchProjectileSimulator, que se integra en un
+# ejecutor para no bloquear el bucle de eventos. Tiene cola acotada (si está
+# llena responde "ocupado" en lugar de encolar sin límite), plazo por
+# petición, caché de resultados y percentiles de latencia.
+# Ejecutar:
+#     python server.py --port 8765                 # HTTP: POST /simulate, GET /stats
+#     python server.py --unix /tmp/simulador.sock  # JSON-lines por socket Unix
+# Petición: {"v0": 30, "angle_deg": 45, "cd": 0.47, "deadline_ms": 200}
+# Respuesta: {"range": ..., "apex": ..., "flight_time": ..., "impact_speed": ..., "landed": ...}
+
+import argparse
+import asyncio
+import inspect
+import json
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from core import ProjectileSimulator
+from sweep import PARAMS, SUMMARY, check_row, run_chunk
+
+INPUTS = PARAMS + ("max_time", "y0")
+# pasos (max_time / dt) como mucho por petición: una sola no puede ocupar el ejecutor mucho tiempo
+MAX_STEPS = 1_000_000
+DEFAULTS = {name: float(p.default) for name, p in inspect.signature(ProjectileSimulator.__init__).parameters.items()
+            if name in INPUTS}
+
+
+class Busy(Exception):
+    """La cola de peticiones está llena (contrapresión)."""
+
+
+class BatchingService:
+    """
+    Agrupa peticiones concurrentes en lotes vectorizados.
+    window: segundos que se espera tras la primera petición de un lote;
+    max_batch: tamaño máximo del lote; max_pending: peticiones en cola antes de
+    responder Busy; timeout: plazo por defecto (s); cache_size: resultados
+    guardados (LRU); workers: lotes en paralelo (más de 1 usa procesos);
+    max_steps: límite de max_time / dt por petición.
+    """
+    def __init__(self, window=0.002, max_batch=4096, max_pending=20000, timeout=5.0,
+                 cache_size=100_000, workers=1, backend="auto", max_steps=MAX_STEPS):
+        self.window = float(window)
+        self.max_steps = int(max_steps)
+        self.max_batch = int(max_batch)
+        self.timeout = float(timeout)
+        self.cache_size = int(cache_size)
+        self.backend = backend
+        self.workers = int(workers)
+        self.queue = asyncio.Queue(max_pending)
+        self.executor = ThreadPoolExecutor(1) if self.workers == 1 else ProcessPoolExecutor(self.workers)
+        self.cache = OrderedDict()
+        self.latencies = deque(maxlen=100_000)      # segundos, últimas peticiones servidas
+        self.counters = dict(requests=0, cache_hits=0, rejected=0, expired=0, errors=0,
+                             batches=0, simulated=0)
+        self._slots = None
+        self._tasks = set()
+        self._collector = None
+
+    def start(self):
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+        for task in list(self._tasks):
+            await asyncio.gather(task, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def complete(self, params):
+        """
+        Parámetros completos (con los valores por defecto) como tupla en el
+        orden de INPUTS. ValueError si hay nombres desconocidos o si no pasan
+        sweep.check_row (valores no finitos o no positivos, más de max_steps pasos).
+        """
+        unknown = set(params) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"parámetros desconocidos: {', '.join(sorted(unknown))}")
+        row = dict(DEFAULTS)
+        for name, value in params.items():
+            row[name] = float(value) + 0.0
+        check_row(row, self.max_steps)
+        return tuple(row[name] for name in INPUTS)
+
+    async def simulate(self, params, deadline=None):
+        """
+        Resumen de una simulación (dict con las claves de sweep.SUMMARY).
+        deadline: plazo en segundos (por defecto timeout); si vence se lanza
+        asyncio.TimeoutError, y Busy si la cola está llena.
+        """
+        start = time.perf_counter()
+        self.counters["requests"] += 1
+        key = self.complete(params)
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            self.latencies.append(time.perf_counter() - start)
+            return result
+        budget = self.timeout if deadline is None else float(deadline)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((key, future, start + budget))
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise Busy("cola llena") from None
+        try:
+            # al vencer el plazo wait_for cancela el futuro y el lote lo salta
+            result = await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            self.counters["expired"] += 1
+            raise
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+    async def _collect(self):
+        """Forma lotes: espera la ventana tras la primera petición y toma lo que haya en cola."""
+        while True:
+            batch = [await self.queue.get()]
+            if self.queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            now = time.perf_counter()
+            waiting = OrderedDict()     # parámetros -> futuros (duplicados en un solo proyectil)
+            for key, future, deadline in batch:
+                if future.done():
+                    continue
+                if deadline <= now:
+                    future.cancel()
+                    continue
+                waiting.setdefault(key, []).append(future)
+            if not waiting:
+                return
+            keys = list(waiting)
+            for key, result in zip(keys, await self._summaries(keys)):
+                if isinstance(result, Exception):
+                    self.counters["errors"] += 1
+                else:
+                    self._remember(key, result)
+                for future in waiting[key]:
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def _summaries(self, keys):
+        """
+        Resumen (dict) de cada fila de keys, o la excepción si falla. Si el lote
+        falla se parte en mitades hasta aislar las filas malas, para que una
+        petición errónea no haga fallar a las demás de su lote.
+        """
+        columns = {name: np.array(col) for name, col in zip(INPUTS, zip(*keys))}
+        loop = asyncio.get_running_loop()
+        try:
+            _, _, summary = await loop.run_in_executor(self.executor, run_chunk, 0, columns, self.backend)
+        except Exception as e:
+            if len(keys) == 1:
+                return [e]
+            half = len(keys) // 2
+            return await self._summaries(keys[:half]) + await self._summaries(keys[half:])
+        self.counters["batches"] += 1
+        self.counters["simulated"] += len(keys)
+        values = [summary[name].tolist() for name in SUMMARY]
+        return [dict(zip(SUMMARY, row)) for row in zip(*values)]
+
+    def _remember(self, key, result):
+        if self.cache_size <= 0:
+            return
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def stats(self):
+        """Contadores, tamaño medio de lote, cola y percentiles de latencia (ms)."""
+        out = dict(self.counters)
+        out["mean_batch"] = self.counters["simulated"] / self.counters["batches"] if self.counters["batches"] else 0.0
+        out["queued"] = self.queue.qsize()
+        out["cached"] = len(self.cache)
+        if self.latencies:
+            lat = np.array(self.latencies) * 1e3
+            for p in (50, 90, 99, 99.9):
+                out[f"p{p:g}_ms"] = float(np.percentile(lat, p))
+            out["max_ms"] = float(lat.max())
+        return out
+
+
+# -----------------------------
+# Protocolos
+# -----------------------------
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+async def _answer(service, request):
+    """(estado, cuerpo) para un dict de petición; deadline_ms es opcional."""
+    if not isinstance(request, dict):
+        return 400, {"error": "se esperaba un objeto JSON"}
+    params = dict(request)
+    params.pop("id", None)
+    deadline = params.pop("deadline_ms", None)
+    try:
+        result = await service.simulate(params, None if deadline is None else float(deadline) / 1e3)
+    except (ValueError, TypeError) as e:
+        return 400, {"error": str(e)}
+    except Busy:
+        return 503, {"error": "servidor ocupado, reintenta más tarde"}
+    except asyncio.TimeoutError:
+        return 504, {"error": "plazo vencido"}
+    except Exception as e:
+        return 500, {"error": str(e)}
+    return 200, result
+
+
+async def _route(service, method, path, body):
+    """(estado, cuerpo) de una petición HTTP ya leída."""
+    if path == "/stats":
+        return 200, service.stats()
+    if path != "/simulate":
+        return 404, {"error": f"ruta desconocida: {path}"}
+    if method != "POST":
+        return 405, {"error": "usa POST"}
+    try:
+        request = json.loads(body)
+    except ValueError as e:
+        return 400, {"error": f"JSON no válido: {e}"}
+    return await _answer(service, request)
+
+
+async def handle_http(service, reader, writer):
+    """HTTP/1.1 mínimo con conexiones persistentes: POST /simulate y GET /stats."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                # sin una longitud válida no se sabe dónde acaba el cuerpo: se cierra
+                status, payload = 400, {"error": "Content-Length no válido"}
+                headers["connection"] = "close"
+            else:
+                body = await reader.readexactly(length)
+                status, payload = await _route(service, method, path, body)
+            data = json.dumps(payload).encode()
+            head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n")
+            if status == 503:
+                head += "Retry-After: 1\r\n"
+            writer.write(head.encode() + b"\r\n" + data)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def handle_lines(service, reader, writer):
+    """
+    JSON-lines: una petición por línea, respondidas según terminan (pueden ir
+    en otro orden; "id" se devuelve tal cual). {"stats": true} da las estadísticas.
+    """
+    tasks = set()
+
+    async def one(line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            request = None
+            status, payload = 400, {"error": f"JSON no válido: {e}"}
+        else:
+            if isinstance(request, dict) and request.get("stats"):
+                status, payload = 200, service.stats()
+            else:
+                status, payload = await _answer(service, request)
+        reply = {"status": status}
+        if isinstance(request, dict) and "id" in request:
+            reply["id"] = request["id"]
+        if status == 200:
+            reply["result"] = payload
+        else:
+            reply["error"] = payload["error"]
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(one(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks, return_exceptions=True)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, unix=None, ready=None, **options):
+    """Arranca el servicio y atiende hasta que se cancela. ready(servidor) se llama al escuchar."""
+    service = BatchingService(**options)
+    service.start()
+    if unix:
+        server = await asyncio.start_unix_server(lambda r, w: handle_lines(service, r, w), path=unix)
+    else:
+        server = await asyncio.start_server(lambda r, w: handle_http(service, r, w), host, port)
+    if ready:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio de simulación con agrupación de peticiones")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="ruta de un socket Unix (JSON-lines) en lugar de HTTP")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="espera para formar cada lote")
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument("--max-pending", type=int, default=20000, help="peticiones en cola antes de responder 503")
+    parser.add_argument("--timeout-ms", type=float, default=5000.0, help="plazo por defecto de cada petición")
+    parser.add_argument("--cache-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1, help="lotes en paralelo (más de 1 usa procesos)")
+    parser.add_argument("--backend", choices=("auto", "python", "numba"), default="auto")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS, help="límite de max_time / dt por petición")
+    args = parser.parse_args(argv)
+
+    where = args.unix or f"http://{args.host}:{args.port}"
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix,
+                          ready=lambda server: print(f"escuchando en {where}", flush=True),
+                          window=args.window_ms / 1e3, max_batch=args.max_batch,
+                          max_pending=args.max_pending, timeout=args.timeout_ms / 1e3,
+                          cache_size=args.cache_size, workers=args.workers, backend=args.backend,
+                          max_steps=args.max_steps))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
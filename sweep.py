@@ -0,0 +1,235 @@
+# sweep.py
+# Barridos de parámetros (rejilla o Monte Carlo) repartidos en trozos entre
+# varios procesos. Cada trozo se integra de una vez con BatchProjectileSimulator
+# y los resúmenes (alcance, altura máxima, tiempo de vuelo, velocidad de
+# impacto) se devuelven en cuanto termina su trozo.
+# Uso:
+#     for fila in run_sweep(Grid(v0=range(10, 60), angle_deg=range(5, 90, 5)), progress=print):
+#         ...
+
+import inspect
+import itertools
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import analytic
+from core import BatchProjectileSimulator
+
+# las nueve entradas de la interfaz
+PARAMS = ("v0", "angle_deg", "mass", "area", "cd", "wind", "g", "rho", "dt")
+SUMMARY = ("range", "apex", "flight_time", "impact_speed", "landed")
+# con valores no positivos la integración no termina o divide por cero
+POSITIVE = ("dt", "mass", "max_time")
+# pasos (max_time / dt) como mucho por ejecución
+MAX_STEPS = 10_000_000
+_DEFAULTS = {name: p.default for name, p in inspect.signature(BatchProjectileSimulator.__init__).parameters.items()
+             if p.default is not inspect.Parameter.empty}
+
+
+def _check_names(names):
+    unknown = set(names) - set(PARAMS) - {"max_time", "y0"}
+    if unknown:
+        raise ValueError(f"parámetros desconocidos: {', '.join(sorted(unknown))}")
+
+
+def check_row(row, max_steps=MAX_STEPS):
+    """
+    ValueError si algún valor de row (dict completo de parámetros) no es
+    finito, si alguno de POSITIVE no es positivo o si max_time / dt pasa de
+    max_steps (una sola ejecución podría tardar sin límite).
+    """
+    for name, value in row.items():
+        if not math.isfinite(value):
+            raise ValueError(f"{name} debe ser finito")
+    for name in POSITIVE:
+        if row[name] <= 0.0:
+            raise ValueError(f"{name} debe ser positivo")
+    if row["max_time"] / row["dt"] > max_steps:
+        raise ValueError(f"max_time / dt supera el límite de {max_steps} pasos")
+
+
+class Grid:
+    """
+    Producto cartesiano de valores por parámetro; un escalar queda fijo.
+        Grid(v0=[20, 30, 40], angle_deg=np.arange(5, 90, 5), cd=0.47)
+    """
+    def __init__(self, **axes):
+        _check_names(axes)
+        self.axes = {name: [float(v) for v in np.atleast_1d(values)] for name, values in axes.items()}
+
+    def __len__(self):
+        return int(np.prod([len(v) for v in self.axes.values()], dtype=np.int64))
+
+    def __iter__(self):
+        names = list(self.axes)
+        for combo in itertools.product(*self.axes.values()):
+            yield dict(zip(names, combo))
+
+
+class MonteCarlo:
+    """
+    n muestras aleatorias reproducibles (misma semilla -> mismas muestras).
+    Cada parámetro es un escalar fijo, una tupla (min, max) uniforme o una
+    función rng -> valor (p. ej. lambda rng: rng.normal(30, 0.5)).
+    """
+    def __init__(self, n, seed=None, **distributions):
+        _check_names(distributions)
+        self.n = int(n)
+        self.seed = seed
+        self.distributions = distributions
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        samplers = {}
+        for name, dist in self.distributions.items():
+            if callable(dist):
+                samplers[name] = dist
+            elif isinstance(dist, tuple):
+                samplers[name] = lambda rng, lo=dist[0], hi=dist[1]: rng.uniform(lo, hi)
+            else:
+                samplers[name] = lambda rng, value=float(dist): value
+        for _ in range(self.n):
+            yield {name: float(sample(rng)) for name, sample in samplers.items()}
+
+
+def _chunks(params, size):
+    """Agrupa params (iterable de dicts) en (índice inicial, columnas NumPy)."""
+    it = iter(params)
+    start = 0
+    while True:
+        rows = list(itertools.islice(it, size))
+        if not rows:
+            return
+        names = list(rows[0])
+        yield start, {name: np.array([r[name] for r in rows], dtype=float) for name in names}
+        start += len(rows)
+
+
+def _batch_summary(columns, backend):
+    batch = BatchProjectileSimulator(**columns, backend=backend)
+    batch.run()
+    return {
+        "range": batch.x,
+        "apex": batch.y_max,
+        "flight_time": batch.t,
+        "impact_speed": np.hypot(batch.vx, batch.vy),
+        "landed": batch.y <= 0.0,
+    }
+
+
+def run_chunk(start, columns, backend="auto", closed_form=False):
+    """
+    Integra un trozo y devuelve (start, columnas, resúmenes) como arrays de NumPy.
+    Con closed_form=True las filas sin arrastre (cd, area o rho nulos) se
+    resuelven con la parábola exacta (analytic.vacuum_summary) sin integrar.
+    """
+    if not closed_form:
+        return start, columns, _batch_summary(columns, backend)
+    n = len(next(iter(columns.values()))) if columns else 1
+    full = {name: np.broadcast_to(columns.get(name, _DEFAULTS[name]), n) for name in PARAMS + ("max_time", "y0")}
+    free = analytic.drag_free(full["cd"], full["area"], full["rho"])
+    if not free.any():
+        return start, columns, _batch_summary(columns, backend)
+    summary = {name: np.empty(n, dtype=bool if name == "landed" else float) for name in SUMMARY}
+    exact = analytic.vacuum_summary(*(full[name][free] for name in ("v0", "angle_deg", "g", "y0", "max_time")))
+    for name in SUMMARY:
+        summary[name][free] = exact[name]
+    if not free.all():
+        rest = _batch_summary({name: column[~free] for name, column in columns.items()}, backend)
+        for name in SUMMARY:
+            summary[name][~free] = rest[name]
+    return start, columns, summary
+
+
+def _rows(start, columns, summary):
+    """Convierte el resultado de un trozo en dicts (uno por ejecución)."""
+    names = list(columns) + list(SUMMARY)
+    cols = [c.tolist() for c in columns.values()] + [summary[k].tolist() for k in SUMMARY]
+    for i, values in enumerate(zip(*cols)):
+        row = {"index": start + i}
+        row.update(zip(names, values))
+        yield row
+
+
+def run_chunks(chunks, max_workers=None, cancel=None, backend="auto", ordered=False, closed_form=False):
+    """
+    Integra trozos (start, columnas) con run_chunk, repartidos entre procesos, y
+    genera sus resultados (start, columnas, resúmenes) según terminan, o en el
+    orden de chunks con ordered=True. Como mucho hay 2 trozos en vuelo por
+    proceso, así que chunks puede ser un generador sin fin. cancel y cerrar el
+    generador detienen el envío y cancelan lo pendiente. Con ordered=True los
+    trozos terminados que esperan a uno anterior también cuentan en ese límite.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    chunks = iter(chunks)
+
+    if workers == 1:
+        for start, columns in chunks:
+            if cancel is not None and cancel.is_set():
+                return
+            yield run_chunk(start, columns, backend, closed_form)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+    order = []          # futuros en orden de envío aún sin devolver (ordered=True)
+    try:
+        exhausted = False
+        while True:
+            # memoria acotada aunque chunks sea enorme
+            while (not exhausted and len(order if ordered else pending) < 2 * workers
+                   and not (cancel is not None and cancel.is_set())):
+                nxt = next(chunks, None)
+                if nxt is None:
+                    exhausted = True
+                else:
+                    future = pool.submit(run_chunk, *nxt, backend, closed_form)
+                    pending.add(future)
+                    if ordered:
+                        order.append(future)
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if ordered:
+                while order and order[0].done():
+                    yield order.pop(0).result()
+            else:
+                for future in finished:
+                    yield future.result()
+            if cancel is not None and cancel.is_set():
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_sweep(params, chunk_size=1000, max_workers=None, progress=None, cancel=None, backend="auto",
+              closed_form=False):
+    """
+    Ejecuta cada conjunto de parámetros de params (Grid, MonteCarlo o cualquier
+    iterable de dicts con claves de PARAMS) y devuelve un generador de resúmenes
+    en el orden en que terminan los trozos; "index" es la posición en params.
+
+    max_workers: procesos (por defecto todos los núcleos; 1 = sin procesos).
+    progress(hechos, total): se llama tras cada trozo (total None si params no tiene len).
+    cancel: threading.Event opcional; al activarse no se envían más trozos y se
+    cancelan los pendientes. Cerrar el generador tiene el mismo efecto.
+    closed_form=True resuelve sin integrar las ejecuciones sin arrastre.
+    """
+    total = len(params) if hasattr(params, "__len__") else None
+    done = 0
+    results = run_chunks(_chunks(params, chunk_size), max_workers, cancel, backend, closed_form=closed_form)
+    try:
+        for result in results:
+            rows = list(_rows(*result))
+            done += len(rows)
+            if progress:
+                progress(done, total)
+            yield from rows
+    finally:
+        results.close()
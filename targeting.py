@@ -0,0 +1,260 @@
+# targeting.py
+# Problema inverso: qué ángulo (o qué velocidad) lleva el proyectil a x = X.
+# Tablas alcance(ángulo, v0) por entorno (masa, área, Cd, rho, viento, g),
+# calculadas una vez con BatchProjectileSimulator y guardadas en caché, para
+# responder en microsegundos; el refinado opcional usa el método de Brent
+# sobre el simulador dentro de la celda que indica la tabla, o Newton con la
+# derivada exacta de sensitivity.py (method="newton", menos simulaciones).
+# Uso:
+#     bajo, alto = solve_angle(120.0, v0=40.0, cd=0.47, wind=-3.0)
+
+import functools
+import math
+
+import numpy as np
+
+from core import ProjectileSimulator, BatchProjectileSimulator
+from sensitivity import TangentSimulator
+
+ANGLE_STEP = 1.0        # grados entre filas de la tabla
+SPEED_STEP = 2.5        # m/s entre columnas de la tabla
+V0_MAX = 150.0          # velocidad máxima de la tabla por defecto
+
+
+class RangeTable:
+    """
+    Alcances simulados en una rejilla uniforme ranges[i, j] = alcance(angles[i], speeds[j])
+    con interpolación lineal y búsqueda inversa vectorizadas.
+    """
+    def __init__(self, angles, speeds, ranges):
+        self.angles = angles
+        self.speeds = speeds
+        self.ranges = ranges
+
+    def _speed_column(self, v0):
+        """Alcance frente al ángulo para una v0 (interpolando entre columnas)."""
+        pos = (v0 - self.speeds[0]) / (self.speeds[1] - self.speeds[0])
+        j = min(max(int(pos), 0), len(self.speeds) - 2)
+        w = pos - j
+        return self.ranges[:, j] * (1.0 - w) + self.ranges[:, j + 1] * w
+
+    def _angle_row(self, angle_deg):
+        pos = (angle_deg - self.angles[0]) / (self.angles[1] - self.angles[0])
+        i = min(max(int(pos), 0), len(self.angles) - 2)
+        w = pos - i
+        return self.ranges[i] * (1.0 - w) + self.ranges[i + 1] * w
+
+    def covers(self, v0):
+        return self.speeds[0] <= v0 <= self.speeds[-1]
+
+    def range(self, angle_deg, v0):
+        """Alcance interpolado (bilineal)."""
+        col = self._speed_column(v0)
+        return float(np.interp(angle_deg, self.angles, col))
+
+    def angle_brackets(self, x_target, v0):
+        """
+        Celdas [ángulo_i, ángulo_i+1] donde el alcance cruza x_target: la primera
+        antes del alcance máximo (tiro bajo) y la última después (tiro alto).
+        """
+        f = self._speed_column(v0) - x_target
+        cross = np.flatnonzero((f[:-1] < 0.0) != (f[1:] < 0.0))
+        peak = int(np.argmax(f))
+        low = next((i for i in cross if i < peak), None)
+        high = next((i for i in cross[::-1] if i >= peak), None)
+        return [None if i is None else (float(self.angles[i]), float(self.angles[i + 1]), f[i], f[i + 1])
+                for i in (low, high)]
+
+    def angles_for(self, x_target, v0):
+        """(ángulo bajo, ángulo alto) aproximados por interpolación; None si no hay."""
+        return tuple(None if b is None else float(b[0] + (b[1] - b[0]) * b[2] / (b[2] - b[3]))
+                     for b in self.angle_brackets(x_target, v0))
+
+    def speed_bracket(self, x_target, angle_deg):
+        f = self._angle_row(angle_deg) - x_target
+        cross = np.flatnonzero((f[:-1] < 0.0) & (f[1:] >= 0.0))
+        if cross.size == 0:
+            return None
+        j = cross[0]
+        return float(self.speeds[j]), float(self.speeds[j + 1]), f[j], f[j + 1]
+
+    def speed_for(self, x_target, angle_deg):
+        """v0 aproximada para alcanzar x_target con ese ángulo; None si no hay."""
+        b = self.speed_bracket(x_target, angle_deg)
+        return None if b is None else float(b[0] + (b[1] - b[0]) * b[2] / (b[2] - b[3]))
+
+
+@functools.lru_cache(maxsize=32)
+def range_table(mass=1.0, area=0.01, cd=0.47, wind=0.0, g=9.81, rho=1.225, dt=0.01, v0_max=V0_MAX):
+    """Tabla de alcances de un entorno (se calcula una vez y queda en caché)."""
+    angles = np.arange(0.0, 90.0 + ANGLE_STEP / 2, ANGLE_STEP)
+    speeds = np.arange(0.0, v0_max + SPEED_STEP / 2, SPEED_STEP)
+    aa, vv = np.meshgrid(angles, speeds, indexing="ij")
+    batch = BatchProjectileSimulator(v0=vv, angle_deg=aa, mass=mass, area=area, cd=cd,
+                                     wind=wind, g=g, rho=rho, dt=dt)
+    batch.run()
+    return RangeTable(angles, speeds, batch.x.reshape(aa.shape))
+
+
+def _table_for(v0, env):
+    v0_max = V0_MAX
+    while v0 > v0_max:
+        v0_max *= 2.0
+    return range_table(**env, v0_max=v0_max)
+
+
+def simulated_range(angle_deg, v0, **env):
+    """Alcance de una simulación completa (x del impacto)."""
+    return ProjectileSimulator(v0=v0, angle_deg=angle_deg, **env).run().range
+
+
+def range_and_derivative(angle_deg, v0, param, **env):
+    """(alcance, d(alcance)/d(param)) de una sola simulación con sensibilidades."""
+    sim = TangentSimulator(v0=v0, angle_deg=angle_deg, **env)
+    traj = sim.run()
+    return traj.range, sim.jacobians["ground"]["x", param]
+
+
+def newton(fdf, x, a, b, fa, xtol=1e-9, max_iter=50):
+    """
+    Raíz de f en [a, b], con f(a) del signo de fa, por Newton desde x con
+    fdf(x) -> (f(x), f'(x)); los pasos que salen del intervalo se sustituyen
+    por bisección.
+    """
+    for _ in range(max_iter):
+        f, df = fdf(x)
+        if f == 0.0:
+            return x
+        if (f > 0.0) == (fa > 0.0):
+            a = x
+        else:
+            b = x
+        new = x - f / df if df != 0.0 else math.nan
+        if not min(a, b) < new < max(a, b):
+            new = 0.5 * (a + b)
+        if abs(new - x) <= xtol:
+            return new
+        x = new
+    return x
+
+
+def _check_method(method):
+    if method not in ("brent", "newton"):
+        raise ValueError(f"método desconocido: {method!r} (opciones: brent, newton)")
+
+
+def brent(f, a, b, fa, fb, xtol=1e-9, max_iter=100):
+    """Raíz de f en [a, b] con f(a) y f(b) de signos opuestos (método de Brent)."""
+    if fa == 0.0:
+        return a
+    if fb == 0.0:
+        return b
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if (fb > 0.0) == (fc > 0.0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2.0 * 2.2e-16 * abs(b) + 0.5 * xtol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0.0:
+            return b
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2.0 * m * s, 1.0 - s           # secante
+            else:
+                q, r = fa / fc, fb / fc               # interpolación cuadrática inversa
+                p = s * (2.0 * m * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0.0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = f(b)
+    return b
+
+
+def _refine(f, fdf, a, b, guess, method, xtol):
+    """
+    Raíz de f en la celda [a, b] de la tabla, con Brent o con Newton desde
+    guess (la estimación de la tabla). Los signos en los bordes salen de la
+    simulación: si no cambian (la tabla interpolada y la simulación discrepan
+    en el borde), se queda guess.
+    """
+    fa, fb = f(a), f(b)
+    if (fa > 0.0) == (fb > 0.0):
+        return guess
+    if method == "newton":
+        return float(newton(fdf, guess, a, b, fa, xtol=xtol))
+    return brent(f, a, b, fa, fb, xtol=xtol)
+
+
+def solve_angle(x_target, v0, mass=1.0, area=0.01, cd=0.47, wind=0.0, g=9.81, rho=1.225, dt=0.01,
+                refine=True, xtol=1e-6, method="brent"):
+    """
+    Ángulos (grados) que llevan a x = x_target con velocidad v0: (tiro bajo, tiro alto).
+    Un elemento es None si esa solución no existe. Con refine=False la respuesta
+    sale solo de la tabla en caché (sin simular); con refine=True se ajusta sobre
+    el simulador dentro de la celda de la tabla con Brent o, con method="newton",
+    con Newton desde la estimación de la tabla y la derivada exacta del alcance.
+    """
+    _check_method(method)
+    env = dict(mass=mass, area=area, cd=cd, wind=wind, g=g, rho=rho, dt=dt)
+    table = _table_for(v0, env)
+    if not refine:
+        return table.angles_for(x_target, v0)
+
+    def f(angle):
+        return simulated_range(angle, v0, **env) - x_target
+
+    def fdf(angle):
+        x, dx = range_and_derivative(angle, v0, "angle_deg", **env)
+        return x - x_target, dx
+
+    out = []
+    for bracket in table.angle_brackets(x_target, v0):
+        if bracket is None:
+            out.append(None)
+            continue
+        a, b = bracket[0], bracket[1]
+        guess = float(a + (b - a) * bracket[2] / (bracket[2] - bracket[3]))
+        out.append(_refine(f, fdf, a, b, guess, method, xtol))
+    return tuple(out)
+
+
+def solve_speed(x_target, angle_deg, mass=1.0, area=0.01, cd=0.47, wind=0.0, g=9.81, rho=1.225,
+                dt=0.01, refine=True, xtol=1e-6, method="brent"):
+    """Velocidad inicial que lleva a x = x_target con el ángulo dado (None si no hay)."""
+    _check_method(method)
+    env = dict(mass=mass, area=area, cd=cd, wind=wind, g=g, rho=rho, dt=dt)
+    v0_max = V0_MAX
+    while True:
+        table = range_table(**env, v0_max=v0_max)
+        bracket = table.speed_bracket(x_target, angle_deg)
+        if bracket is not None or v0_max >= 16 * V0_MAX:
+            break
+        v0_max *= 2.0
+    if bracket is None:
+        return None
+    if not refine:
+        return table.speed_for(x_target, angle_deg)
+
+    def f(v0):
+        return simulated_range(angle_deg, v0, **env) - x_target
+
+    def fdf(v0):
+        x, dx = range_and_derivative(angle_deg, v0, "v0", **env)
+        return x - x_target, dx
+
+    return _refine(f, fdf, bracket[0], bracket[1], table.speed_for(x_target, angle_deg), method, xtol)
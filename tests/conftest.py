@@ -0,0 +1,10 @@
+# conftest.py
+# Los módulos del simulador están en la carpeta del proyecto (sin paquete
+# instalado): se añade al path como hace __main__.py.
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
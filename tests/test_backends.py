@@ -0,0 +1,115 @@
+# test_backends.py
+# Paridad bit a bit entre los caminos de integración: backend "python" frente
+# a "numba" (kernels.py), en ProjectileSimulator y en BatchProjectileSimulator,
+# y el lote frente al simulador escalar (también con entorno variable). La velocidad se mide aparte con
+# python -m bench.backends.
+
+import numpy as np
+import pytest
+
+import kernels
+from core import BatchProjectileSimulator, ProjectileSimulator
+from environment import Environment, inverse_square_gravity, isa_density, power_law_wind
+
+needs_numba = pytest.mark.skipif(not kernels.HAVE_NUMBA, reason="numba no está instalado")
+
+# arrastre fuerte y nulo, viento, altura inicial, ángulos negativos, corte
+# por max_time y paso fino
+CASES = [
+    dict(),
+    dict(v0=80.0, angle_deg=70.0, cd=0.1, wind=-5.0),
+    dict(v0=15.0, angle_deg=10.0, mass=0.05, cd=1.2, wind=8.0),
+    dict(cd=0.0, area=0.0),
+    dict(y0=10.0, angle_deg=-10.0, mass=0.2),
+    dict(v0=300.0, angle_deg=60.0, max_time=2.0),
+    dict(v0=5.0, angle_deg=89.0, dt=0.001),
+]
+
+STATE = ("x", "y", "vx", "vy", "t")
+
+
+def random_batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(v0=rng.uniform(5, 80, n), angle_deg=rng.uniform(-20, 89, n), mass=rng.uniform(0.1, 5, n),
+                cd=rng.uniform(0, 1, n), wind=rng.uniform(-10, 10, n), y0=rng.choice([0.0, 0.0, 5.0], n),
+                max_time=rng.choice([300.0, 300.0, 1.5], n))
+
+
+def batch_state(batch):
+    return np.stack([getattr(batch, name) for name in STATE + ("y_max",)])
+
+
+@needs_numba
+@pytest.mark.parametrize("params", CASES)
+def test_run_numba_matches_python(params):
+    ref = ProjectileSimulator(**params, backend="python").run()
+    fast = ProjectileSimulator(**params, backend="numba").run()
+    assert fast.data.shape == ref.data.shape
+    assert np.array_equal(fast.data, ref.data)
+    assert fast.events == ref.events
+
+
+@needs_numba
+@pytest.mark.parametrize("params", CASES)
+def test_run_until_numba_matches_python(params):
+    """Pausar y seguir con el núcleo compilado da las mismas muestras."""
+    sims = [ProjectileSimulator(**params, backend=backend) for backend in ("python", "numba")]
+    parts = [[sim.run(until=0.7).data, sim.run().data] for sim in sims]
+    for ref, fast in zip(*parts):
+        assert np.array_equal(fast, ref)
+
+
+@needs_numba
+def test_batch_numba_matches_python():
+    params = random_batch(2000)
+    results = []
+    for backend in ("python", "numba"):
+        batch = BatchProjectileSimulator(**params, backend=backend)
+        batch.run()
+        results.append(batch_state(batch))
+        assert batch.finished.all()
+    assert np.array_equal(*results)
+
+
+@pytest.mark.parametrize("backend", [
+    "python",
+    pytest.param("numba", marks=needs_numba),
+])
+def test_batch_matches_scalar(backend):
+    params = random_batch(200, seed=1)
+    batch = BatchProjectileSimulator(**params, backend=backend)
+    batch.run()
+    for i in range(batch.n):
+        sim = ProjectileSimulator(**{name: float(value[i]) for name, value in params.items()}, backend="python")
+        traj = sim.run()
+        assert tuple(getattr(sim, name) for name in STATE) == tuple(getattr(batch, name)[i] for name in STATE)
+        assert traj.y.max() == batch.y_max[i]
+
+
+def test_batch_step_matches_run():
+    """step() a mano y run() (con y sin numba) terminan en el mismo estado."""
+    params = random_batch(500, seed=2)
+    stepped = BatchProjectileSimulator(**params, backend="python")
+    while stepped.n_active:
+        stepped.step()
+    ran = BatchProjectileSimulator(**params)
+    ran.run()
+    assert np.array_equal(batch_state(stepped), batch_state(ran))
+
+
+@pytest.mark.parametrize("env", [
+    dict(rho=isa_density, wind=power_law_wind(5.0)),
+    dict(g=inverse_square_gravity(), gust=lambda t: 3.0 * np.sin(t)),
+    dict(rho=isa_density, wind=power_law_wind(5.0), g=inverse_square_gravity(),
+         gust=lambda t: 3.0 * np.sin(t), cd_mach=([0, 0.8, 1.0, 1.2, 3], [0.47, 0.5, 0.8, 0.95, 0.9])),
+])
+def test_batch_env_matches_scalar(env):
+    env = Environment(**env)
+    params = random_batch(100, seed=3)
+    params["v0"] = params["v0"] * 5.0          # hasta Mach 1.2
+    batch = BatchProjectileSimulator(**params, env=env)
+    batch.run()
+    for i in range(batch.n):
+        sim = ProjectileSimulator(**{name: float(value[i]) for name, value in params.items()}, env=env)
+        sim.run()
+        assert tuple(getattr(sim, name) for name in STATE) == tuple(getattr(batch, name)[i] for name in STATE)